@@ -1,5 +1,7 @@
 import streamlit as st
 
+from retail import startup
+
 # Page configuration
 st.set_page_config(
     page_title="MonsoonSIM - Retail Module Tools",
@@ -8,12 +10,13 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Load the analysis modules in the background while this page is read.
+startup.warm_up()
+
 # Custom CSS
 st.markdown(
     """
     <style>
-    @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@300;400;500;700&display=swap');
-    
     body {
         color: #E0E0E0;
         background-color: #1E1E1E;
@@ -107,11 +110,15 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# Display a retail-related image
-st.image(
-    "https://images.unsplash.com/photo-1556740738-b6a63e27c4df?auto=format&fit=crop&w=1000&q=80",
-    caption="Innovative Retail Solutions",
-    use_column_width=True,
+# Display a retail-related image, served from static/ (see .streamlit/config.toml)
+st.markdown(
+    "<figure style='margin: 0; text-align: center;'>"
+    "<img src='app/static/retail-banner.svg' alt='Retail store front' "
+    "style='width: 100%; max-width: 1000px; border-radius: 10px;'>"
+    "<figcaption style='color: #9E9E9E; font-size: 0.9rem; margin-top: 0.5rem;'>"
+    "Innovative Retail Solutions</figcaption>"
+    "</figure>",
+    unsafe_allow_html=True,
 )
 
 st.markdown(
@@ -165,7 +172,8 @@ with st.expander("Features"):
 
     7. Session State Management:
         - Store and retrieve location-specific information using Streamlit's session state
-        - Display the session state for the selected rental location in the sidebar as JSON
+        - Browse the session state of the selected rental location in the sidebar: a summary
+          of every field and one paginated, size-bounded section at a time
     """
     )
 
@@ -0,0 +1,169 @@
+"""Cold-start benchmark of the Streamlit server and the first page runs.
+
+Every measurement starts a fresh interpreter, so nothing is imported yet:
+
+* ``server_healthy`` / ``server_static``: ``streamlit run HomePage.py``
+  until ``/_stcore/health`` answers and the banner is served from
+  ``app/static``.
+* ``home_first_run``: first ``AppTest`` run of ``HomePage.py``.
+* ``retail_first_run``: first run of the Retail Module page, either opened
+  directly (``cold``) or after the home page's background warm-up finished
+  (``warm``).
+
+Run it on the machine or in the image being measured, e.g.::
+
+    python benchmarks/bench_coldstart.py --output coldstart.json
+    docker run --rm retail-tools python benchmarks/bench_coldstart.py
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_RUN = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+timings = {{"import_streamlit": time.perf_counter() - started}}
+if {home}:
+    start = time.perf_counter()
+    at = AppTest.from_file({home_page!r}, default_timeout=120).run()
+    assert not at.exception, at.exception
+    timings["home_first_run"] = time.perf_counter() - start
+    if {wait}:
+        from retail import startup
+        start = time.perf_counter()
+        startup.warm_up().join()
+        timings["warm_up_wait"] = time.perf_counter() - start
+if {retail}:
+    start = time.perf_counter()
+    at = AppTest.from_file({retail_page!r}, default_timeout=120).run()
+    assert not at.exception, at.exception
+    timings["retail_first_run"] = time.perf_counter() - start
+print(json.dumps(timings))
+"""
+
+
+def first_runs(home=True, retail=True, wait=False):
+    """Timings of one fresh interpreter running the pages once."""
+    code = FIRST_RUN.format(
+        root=ROOT,
+        home=home,
+        retail=retail,
+        wait=wait,
+        home_page=os.path.join(ROOT, "HomePage.py"),
+        retail_page=os.path.join(ROOT, "pages", "1_RetailModul.py"),
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+
+def server_ready(timeout=60):
+    """Seconds until the server is healthy and serves static files."""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "streamlit",
+            "run",
+            "HomePage.py",
+            "--server.headless=true",
+            f"--server.port={port}",
+            "--server.address=127.0.0.1",
+        ],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = started + timeout
+        if not _wait_for(f"{base}/_stcore/health", deadline):
+            raise RuntimeError("server did not become healthy")
+        healthy = time.perf_counter() - started
+        if not _wait_for(f"{base}/app/static/retail-banner.svg", deadline):
+            raise RuntimeError("static files are not served")
+        return {
+            "server_healthy": healthy,
+            "server_static": time.perf_counter() - started,
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def median_of(function, repeat, **kwargs):
+    runs = [function(**kwargs) for _ in range(repeat)]
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-server", action="store_true", help="skip the server")
+    args = parser.parse_args(argv)
+
+    results = {}
+    if not args.no_server:
+        results.update(median_of(server_ready, args.repeat))
+    results.update(median_of(first_runs, args.repeat, retail=False))
+    cold = median_of(first_runs, args.repeat, home=False)
+    warm = median_of(first_runs, args.repeat, wait=True)
+    results["retail_first_run_cold"] = cold["retail_first_run"]
+    results["retail_first_run_warm"] = warm["retail_first_run"]
+    results["warm_up_wait"] = warm["warm_up_wait"]
+    for key, seconds in results.items():
+        print(f"{key}: {seconds:.3f}s")
+
+    if args.output:
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
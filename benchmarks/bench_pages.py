@@ -0,0 +1,210 @@
+"""Headless scalability benchmark for HomePage.py and the Retail Module page.
+
+Every scenario seeds ``st.session_state.store_location`` with ``locations``
+locations of ``products`` products each, fills the selected location's
+editor tables with ``days`` day-rows and runs the page through Streamlit's
+``AppTest`` harness. Script run time, peak traced memory and the pickled
+session-state size are written as JSON, and can be compared against a
+stored baseline:
+
+    python benchmarks/bench_pages.py --output benchmarks/results.json
+    python benchmarks/bench_pages.py --quick --baseline benchmarks/results.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import pickle
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from retail import ingest  # noqa: E402
+
+HOME_PAGE = os.path.join(ROOT, "HomePage.py")
+RETAIL_PAGE = os.path.join(ROOT, "pages", "1_RetailModul.py")
+
+LOCATIONS = (10, 100, 1000)
+PRODUCTS = (3, 50, 500)
+DAYS = (5, 365, 3650)
+QUICK = ((10, 3, 5), (100, 50, 365), (1000, 3, 3650))
+
+
+def build_store(locations, products, days, seed=0):
+    rng = np.random.default_rng(seed)
+    catalog = {
+        f"Product {j}": {
+            "Costs": float(rng.integers(5, 50)),
+            "Initial_Price": float(rng.integers(50, 100)),
+            "Shelf_Life": int(rng.choice([0, 20, 30])),
+            "Product_Dimension": float(rng.uniform(0.001, 0.05)),
+        }
+        for j in range(products)
+    }
+    names = list(catalog)
+    store = {
+        f"Location {i}": {
+            "product": {name: dict(catalog[name]) for name in names},
+            "rental_size": 1000.0,
+            "rental_cost": 5000.0,
+            "overflow_fee": 2.0,
+            "status": True,
+        }
+        for i in range(locations)
+    }
+    tables = {}
+    for kind in ingest.TABLE_KINDS:
+        table = ingest.empty_table(kind, names, days)
+        table.iloc[:, 1:] = rng.poisson(100, (days, table.shape[1] - 1))
+        tables[kind] = table
+    store["Location 0"]["tables"] = tables
+    return store
+
+
+def measure(path, session_state=None, repeat=1, timeout=600):
+    """Run ``path`` ``repeat`` times; returns timings and peak traced memory.
+
+    Every repetition is a fresh session: a cold script run with warm
+    imports.
+    """
+    times = []
+    peak = 0
+    at = None
+    for _ in range(repeat):
+        at = AppTest.from_file(path, default_timeout=timeout)
+        for key, value in (session_state or {}).items():
+            at.session_state[key] = value
+        tracemalloc.start()
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        if at.exception:
+            raise RuntimeError(f"{path} raised: {at.exception[0].message}")
+    return {
+        "run_seconds": statistics.median(times),
+        "run_seconds_min": min(times),
+        "peak_memory_bytes": peak,
+    }, at
+
+
+def session_state_size(at):
+    """Pickled size of every picklable session-state entry."""
+    size = 0
+    for key in at.session_state:
+        try:
+            size += len(pickle.dumps(at.session_state[key]))
+        except Exception:
+            pass
+    return size
+
+
+def run_scenario(locations, products, days, repeat):
+    store = build_store(locations, products, days)
+    result, at = measure(RETAIL_PAGE, {"store_location": store}, repeat=repeat)
+    result.update(
+        {
+            "page": "retail",
+            "locations": locations,
+            "products": products,
+            "days": days,
+            "session_state_bytes": session_state_size(at),
+        }
+    )
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Print ratios against ``baseline``; returns the regressed scenarios."""
+
+    def key(row):
+        return (row["page"], row.get("locations"), row.get("products"), row.get("days"))
+
+    stored = {key(row): row for row in baseline["results"]}
+    regressions = []
+    for row in results:
+        old = stored.get(key(row))
+        if old is None:
+            continue
+        ratio = row["run_seconds"] / old["run_seconds"] if old["run_seconds"] else 1.0
+        memory = (
+            row["peak_memory_bytes"] / old["peak_memory_bytes"]
+            if old["peak_memory_bytes"]
+            else 1.0
+        )
+        flag = "REGRESSION" if ratio > 1 + tolerance else ""
+        print(f"{key(row)}: time x{ratio:.2f}, memory x{memory:.2f} {flag}")
+        if flag:
+            regressions.append(row)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--output", default=os.path.join(ROOT, "benchmarks", "results.json")
+    )
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="run a small subset")
+    parser.add_argument("--locations", type=int, nargs="*", default=LOCATIONS)
+    parser.add_argument("--products", type=int, nargs="*", default=PRODUCTS)
+    parser.add_argument("--days", type=int, nargs="*", default=DAYS)
+    args = parser.parse_args(argv)
+
+    scenarios = (
+        QUICK
+        if args.quick
+        else itertools.product(args.locations, args.products, args.days)
+    )
+
+    # Warm up imports so the first scenario is not charged for them.
+    measure(HOME_PAGE)
+    measure(RETAIL_PAGE, {"store_location": build_store(1, 3, 5)})
+
+    home, _ = measure(HOME_PAGE, repeat=args.repeat)
+    home["page"] = "home"
+    results = [home]
+    print(f"home: {home['run_seconds']:.3f}s")
+    for locations, products, days in scenarios:
+        row = run_scenario(locations, products, days, args.repeat)
+        results.append(row)
+        print(
+            f"retail L={locations} P={products} D={days}: "
+            f"{row['run_seconds']:.3f}s, "
+            f"peak {row['peak_memory_bytes'] / 2**20:.1f} MiB, "
+            f"state {row['session_state_bytes'] / 2**20:.1f} MiB"
+        )
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
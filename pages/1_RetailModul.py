@@ -1,9 +1,33 @@
+import io
+import os
+import time
+import uuid
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
 
+from retail import (
+    cache,
+    catalog,
+    charts,
+    engine,
+    forecast,
+    ingest,
+    jobs,
+    montecarlo,
+    optimizer,
+    persistence,
+    pricing,
+    profiling,
+    schema,
+    simulation,
+    stateview,
+    stats,
+    timeseries,
+)
+
 st.set_page_config(
     page_title="Retail Module Tools",
     page_icon="🏪",
@@ -11,108 +35,76 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-product_data = {
-    "Juices": {
-        "Apple Juice": {
-            "Costs": 15,
-            "Initial_Price": 26,
-            "Shelf_Life": 30,
-            "Product_Dimension": 0.0033,
-        },
-        "Orange Juice": {
-            "Costs": 17,
-            "Initial_Price": 29,
-            "Shelf_Life": 25,
-            "Product_Dimension": 0.0033,
-        },
-        "Melon Juice": {
-            "Costs": 19,
-            "Initial_Price": 31,
-            "Shelf_Life": 20,
-            "Product_Dimension": 0.0033,
-        },
-    },
-    "Gadgets": {
-        "Laptop": {
-            "Costs": 250,
-            "Initial_Price": 560,
-            "Shelf_Life": 0,
-            "Product_Dimension": 0.31,
-        },
-        "Smartphone": {
-            "Costs": 170,
-            "Initial_Price": 290,
-            "Shelf_Life": 0,
-            "Product_Dimension": 0.012,
-        },
-        "Witchtendo Switch": {
-            "Costs": 190,
-            "Initial_Price": 310,
-            "Shelf_Life": 0,
-            "Product_Dimension": 0.024,
-        },
-    },
-    "Cafe Drinks": {
-        "Americano": {
-            "Costs": 10,
-            "Initial_Price": 32,
-            "Shelf_Life": 30,
-            "Product_Dimension": 0.005,
-        },
-        "Hot Chocolate": {
-            "Costs": 13,
-            "Initial_Price": 35,
-            "Shelf_Life": 25,
-            "Product_Dimension": 0.005,
-        },
-        "Bubble Milk Tea": {
-            "Costs": 16,
-            "Initial_Price": 38,
-            "Shelf_Life": 20,
-            "Product_Dimension": 0.005,
-        },
-    },
-    "Automobiles": {
-        "Sedan": {
-            "Costs": 15000,
-            "Initial_Price": 28000,
-            "Shelf_Life": 0,
-            "Product_Dimension": 18.5,
-        },
-        "SUV": {
-            "Costs": 17000,
-            "Initial_Price": 36000,
-            "Shelf_Life": 0,
-            "Product_Dimension": 23.2,
-        },
-        "Truck": {
-            "Costs": 19000,
-            "Initial_Price": 41000,
-            "Shelf_Life": 0,
-            "Product_Dimension": 28.2,
-        },
-    },
-    "Medical Mask": {
-        "Dust Mask": {
-            "Costs": 18,
-            "Initial_Price": 40,
-            "Shelf_Life": 0,
-            "Product_Dimension": 0.0133,
-        },
-        "Surgical Mask": {
-            "Costs": 10,
-            "Initial_Price": 20,
-            "Shelf_Life": 0,
-            "Product_Dimension": 0.0083,
-        },
-        "KN95": {
-            "Costs": 19,
-            "Initial_Price": 31,
-            "Shelf_Life": 0,
-            "Product_Dimension": 0.012,
-        },
-    },
-}
+if "profiler" not in st.session_state:
+    st.session_state.profiler = profiling.Profiler()
+profiler = st.session_state.profiler
+profiler.enabled = st.session_state.get("profiling_enabled", profiling.enabled_by_env())
+profiler.start_run()
+run_started = time.perf_counter()
+
+
+# Loaded once per process; location records refer to it by category.
+product_catalog = catalog.shared()
+# SQLite store when RETAIL_DB_PATH is set, else session-only state.
+location_store = persistence.shared()
+
+
+@st.cache_resource
+def result_cache():
+    # Shared by every session, keyed by the content of each analysis' inputs.
+    return cache.ResultCache()
+
+
+def cached(namespace, function, *args, **kwargs):
+    return result_cache().call(namespace, function, *args, **kwargs)
+
+
+@st.cache_resource
+def job_runner():
+    # Shared by every session; the pool size bounds concurrent heavy jobs.
+    return jobs.JobRunner()
+
+
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+session_id = st.session_state.session_id
+
+
+def job_status(state_key, label, show_result, polling):
+    job = job_runner().get(st.session_state[state_key][0])
+    if job is None:
+        return
+    if not job.done:
+        st.progress(job.progress, text=f"{label}: {job.message or job.status}")
+        if st.button(
+            label=f"Cancel {label}",
+            key=f"{state_key}_cancel",
+            use_container_width=True,
+        ):
+            job.cancel()
+            st.rerun()
+        return
+    if polling:
+        # Stop polling and show the result.
+        st.rerun()
+
+    if job.status == "cancelled":
+        st.info(f"{label} cancelled.")
+    elif job.status == "failed":
+        st.error(f"{label} failed: {job.error}")
+    else:
+        show_result(state_key, job.result())
+
+
+def show_job(state_key, label, show_result):
+    """Progress of the background job in ``state_key``, then its result."""
+    if state_key not in st.session_state:
+        return
+    job = job_runner().get(st.session_state[state_key][0])
+    polling = job is not None and not job.done
+    st.fragment(job_status, run_every=1.0 if polling else None)(
+        state_key, label, show_result, polling
+    )
 
 
 def update_session_state(location, data):
@@ -120,49 +112,128 @@ def update_session_state(location, data):
         st.session_state.store_location = {}
     if location not in st.session_state.store_location:
         st.session_state.store_location[location] = {}
-    st.session_state.store_location[location].update(data)
+    record = st.session_state.store_location[location]
+    record.update(data)
+    # The dashboard only recomputes locations whose version changed.
+    record["version"] = record.get("version", 0) + 1
+    if location_store is not None:
+        location_store.save_record(location, record)
+
+
+def store_table(location, kind, table):
+    tables = get_session_value(location, "tables", None)
+    if tables is None:
+        tables = {}
+    tables[kind] = table
+    update_session_state(location, {"tables": tables})
+    if location_store is not None:
+        location_store.save_table(location, kind, table)
 
 
 def get_session_value(loc, key, default_value):
     return st.session_state.store_location.get(loc, {}).get(key, default_value)
 
 
-if "store_location" not in st.session_state:
-    st.session_state.store_location = {}
+def state_viewer(location, record):
+    st.dataframe(stateview.summary(record), hide_index=True, use_container_width=True)
+    sections = stateview.children(record)
+    if not sections:
+        return
+    section = st.selectbox("Section", sections, key=f"{location}_state_section")
+    value = record[section]
+    items = stateview.children(value)
+    item = None
+    if items:
+        item = st.selectbox(
+            "Item", [None] + items, key=f"{location}_{section}_state_item"
+        )
+        if item is not None:
+            value = value[item]
+    page = st.number_input(
+        "Page",
+        min_value=1,
+        max_value=stateview.num_pages(value),
+        key=f"{location}_{section}_{item}_state_page",
+    )
+    st.json(stateview.preview(value, page=int(page) - 1))
 
-with st.sidebar:
-    with st.expander("Input Locations & Category"):
-        locations = st.text_area(
-            "Enter location names (one per line)", "Jakarta\nSingapore\nBangkok"
-        ).split("\n")
 
-        locations = [loc.strip() for loc in locations if loc.strip()]
+def load_table_file(data, name, kind, products, default_location, progress):
+    return ingest.read_table(
+        io.BytesIO(data),
+        kind,
+        list(products),
+        file_format=ingest.file_format(name),
+        default_location=default_location,
+        progress=progress,
+    )
 
-        category = st.selectbox(
-            label="Product Configuration",
-            options=product_data.keys(),
-            key="category_selector",
+
+def get_table(location, kind, products, num_rows=0):
+    table = get_session_value(location, "tables", {}).get(kind)
+    if table is None:
+        return ingest.empty_table(kind, products, num_rows)
+    return table
+
+
+def location_velocity(location, products):
+    """Average units sold per day from the location's Sales Velocity table."""
+    table = get_table(location, "velocity", products)
+    return np.nan_to_num(
+        cached(
+            "Sales Velocity",
+            engine.sales_velocity,
+            schema.matrix(table, [f"UnitSold - {product}" for product in products]),
+            schema.days(table),
         )
+    )
 
-        if st.button(label="Apply Data", type="primary", use_container_width=True):
-            for location in locations:
-                update_session_state(
-                    location,
-                    {"product": product_data[category].copy(), "status": False},
-                )
-            st.success(f"Configuration applied successfully!")
 
-with st.sidebar:
-    st.markdown(body="---")
-    if st.session_state.store_location:
-        rental_location = st.selectbox(
-            "Retail Location", list(st.session_state.store_location.keys())
+def table_importer(location, kind, products):
+    uploaded = st.file_uploader(
+        label="Import CSV / Parquet (optional 'Location' column)",
+        type=["csv", "parquet", "pq"],
+        key=f"{kind}_import",
+    )
+    if uploaded is not None and st.button(
+        label="Import Data", key=f"{kind}_import_apply", use_container_width=True
+    ):
+        import_inputs = (uploaded.getvalue(), uploaded.name, kind, tuple(products))
+        # Runs in the background; the tables are stored once it has finished.
+        job = job_runner().submit(
+            jobs.input_key("import", *import_inputs, location),
+            load_table_file,
+            *import_inputs,
+            location,
+            group=(session_id, location, f"{kind}_import"),
         )
+        st.session_state[f"{location}_{kind}_import_job"] = (job.key, kind)
+        st.session_state.pop(f"{location}_{kind}_import_job_applied", None)
+        st.rerun()
+
+
+def show_import(state_key, tables):
+    job_key, kind = st.session_state[state_key]
+    applied = st.session_state.get(f"{state_key}_applied")
+    if applied is None or applied[0] != job_key:
+        imported = []
+        for location, table in tables.items():
+            if location in st.session_state.store_location:
+                store_table(location, kind, table)
+                imported.append(location)
+        st.session_state[f"{state_key}_applied"] = (job_key, imported)
+        # Show the imported tables in the editors.
+        st.rerun()
+    imported = applied[1]
+    if imported:
+        st.success(f"Imported data for {', '.join(imported)}")
     else:
-        rental_location = None
+        st.error("No known location found in the file.")
 
-if rental_location:
-    products = list(st.session_state.store_location[rental_location]["product"].keys())
+
+@st.fragment
+@profiler.timed("Retail Information")
+def retail_information(rental_location):
     with st.expander(f"{rental_location} - Retail Information", expanded=True):
         with st.form("LocationRental"):
             rental_size = st.number_input(
@@ -179,14 +250,25 @@ if rental_location:
                 key=f"{rental_location}_rental_cost",
                 value=get_session_value(rental_location, "rental_cost", 0.00),
             )
+            overflow_fee = st.number_input(
+                "Overflow Fee (per volume unit)",
+                min_value=0.00,
+                format="%.2f",
+                key=f"{rental_location}_overflow_fee",
+                value=get_session_value(rental_location, "overflow_fee", 0.00),
+            )
 
             st.markdown("---")
 
             # Data Input Tabel
-            df = pd.DataFrame(
-                st.session_state.store_location[rental_location]["product"]
-            ).T.reset_index()
-            df.columns = ["product"] + list(df.columns[1:])
+            with profiler.section("Product Table"):
+                df = pd.DataFrame(
+                    catalog.effective_products(
+                        st.session_state.store_location[rental_location],
+                        product_catalog,
+                    )
+                ).T.reset_index()
+                df.columns = ["product"] + list(df.columns[1:])
             edited_df = st.data_editor(
                 data=df, num_rows="dynamic", use_container_width=True
             )
@@ -196,275 +278,987 @@ if rental_location:
             if st.form_submit_button(
                 label="Apply Information", type="primary", use_container_width=True
             ):
-                edited_data = edited_df.set_index("product").T.to_dict()
+                try:
+                    edited_data = schema.product_records(edited_df)
+                except ValueError as error:
+                    st.error(f"Product table: {error}")
+                    return
+                record = st.session_state.store_location[rental_location]
+                if "product" in record:
+                    products_update = {"product": edited_data}
+                else:
+                    overrides, removed = catalog.diff_products(
+                        product_catalog.view(record["category"]), edited_data
+                    )
+                    products_update = {"overrides": overrides, "removed": removed}
                 update_session_state(
                     rental_location,
                     {
-                        "product": edited_data,
+                        **products_update,
                         "rental_size": rental_size,
                         "rental_cost": rental_cost,
+                        "overflow_fee": overflow_fee,
                         "status": True,
                     },
                 )
+                # The tabs below depend on the applied information.
+                st.rerun()
 
-    if st.session_state.store_location[rental_location]["status"] == True:
-        tab1, tab2, tab3, tab4, tab5 = st.tabs(
-            [
-                "Capacity Planning",
-                "COGS | Sales",
-                "Price Strategy",
-                "Sales Velocity",
-                "Marketing Evaluation",
-            ]
-        )
 
-        with tab1:
-            with st.expander("Optimal Stock"):
-                with st.form("CheckPlanning"):
-                    columns = st.columns(len(products))
-                    optimal_stock_options = [
-                        0,
-                        1000,
-                        3000,
-                        5000,
-                        8000,
-                        12000,
-                        20000,
-                        30000,
-                        40000,
-                        50000,
-                    ]
+@st.fragment
+@profiler.timed("Capacity Planning")
+def capacity_planning(rental_location, products, product_info):
+    with st.expander("Optimal Stock"):
+        with st.form("CheckPlanning"):
+            columns = st.columns(len(products))
+            optimal_stock_options = list(optimizer.STOCK_OPTIONS)
 
-                    planning_values = {}
-                    for i, product in enumerate(products):
-                        with columns[i]:
-                            planning_values[product] = st.selectbox(
-                                label=f"{product} (Unit)",
-                                options=optimal_stock_options,
-                                key=f"{product}_optimalStock",
-                            )
+            planning_values = {}
+            for i, product in enumerate(products):
+                with columns[i]:
+                    planning_values[product] = st.selectbox(
+                        label=f"{product} (Unit)",
+                        options=optimal_stock_options,
+                        key=f"{product}_optimalStock",
+                    )
 
-                    if st.form_submit_button(
-                        label="Calculate: Optimal Stock",
-                        type="primary",
-                        use_container_width=True,
-                    ):
-                        rental_size = get_session_value(
-                            rental_location, "rental_size", 0.00
+            if st.form_submit_button(
+                label="Calculate: Optimal Stock",
+                type="primary",
+                use_container_width=True,
+            ):
+                update_session_state(
+                    rental_location, {"planned_stock": planning_values}
+                )
+                rental_size = get_session_value(rental_location, "rental_size", 0.00)
+
+                if rental_size > 0:
+                    with profiler.section("Stock Percentage"):
+                        stock_percentage = engine.stock_percentage(
+                            product_info.dimension,
+                            [planning_values[product] for product in products],
+                            rental_size,
                         )
 
-                        if rental_size > 0:
-                            restock_size = []
-                            for product in products:
-                                restock_size.append(
-                                    st.session_state.store_location[rental_location][
-                                        "product"
-                                    ][product]["Product_Dimension"]
-                                    * planning_values[product]
-                                )
-                            stock_percentage = sum(restock_size) / rental_size * 100
-
-                            if stock_percentage <= 100:
-                                st.success(f"Stock Percentage: {stock_percentage:.2f}%")
-                            else:
-                                st.error(f"Stock Percentage: {stock_percentage:.2f}%")
-
-            with st.expander("Re-Stock Planning"):
-                with st.form("ReStockPlanning"):
-                    columns = st.columns(len(products))
-                    restock_values = {}
-                    for i, product in enumerate(products):
-                        with columns[i]:
-                            restock_values[product] = st.number_input(
-                                label=f"{product} - Restock",
-                                min_value=0,
-                                key=f"{product}_restock",
-                                step=1000,
-                            )
+                    if stock_percentage <= 100:
+                        st.success(f"Stock Percentage: {stock_percentage:.2f}%")
+                    else:
+                        st.error(f"Stock Percentage: {stock_percentage:.2f}%")
 
-                    if st.form_submit_button(
-                        label="Calculate: Re-Stock Planning",
-                        type="primary",
-                        use_container_width=True,
-                    ):
-                        rental_size = get_session_value(
-                            rental_location, "rental_size", 0.00
+        with st.form("OptimalStockSearch"):
+            col1, col2 = st.columns(2)
+            with col1:
+                objective = st.radio(
+                    label="Objective",
+                    options=["margin", "fill"],
+                    format_func=lambda option: {
+                        "margin": "Highest Margin",
+                        "fill": "Highest Fill",
+                    }[option],
+                    horizontal=True,
+                )
+            with col2:
+                top_k = st.number_input(
+                    label="Best Mixes", min_value=1, max_value=50, value=5
+                )
+
+            if st.form_submit_button(
+                label="Search: Optimal Stock",
+                type="primary",
+                use_container_width=True,
+            ):
+                rental_size = get_session_value(rental_location, "rental_size", 0.00)
+
+                if rental_size > 0:
+                    search_inputs = {
+                        "dimension": product_info.dimension,
+                        "margin": product_info.margin,
+                        "rental_size": rental_size,
+                        "options": optimal_stock_options,
+                        "objective": objective,
+                        "top_k": int(top_k),
+                        "products": products,
+                    }
+                    # Runs in the background; a new submit cancels the stale job.
+                    job = job_runner().submit(
+                        jobs.input_key("stock_search", search_inputs),
+                        optimizer.search_optimal_stock,
+                        group=(session_id, rental_location, "stock_search"),
+                        **search_inputs,
+                    )
+                    st.session_state[f"{rental_location}_stock_search_job"] = (
+                        job.key,
+                        None,
+                    )
+                    st.rerun()
+                else:
+                    st.error("Rental Size must be greater than 0.")
+
+    with st.expander("Re-Stock Planning"):
+        with st.form("ReStockPlanning"):
+            columns = st.columns(len(products))
+            restock_values = {}
+            for i, product in enumerate(products):
+                with columns[i]:
+                    restock_values[product] = st.number_input(
+                        label=f"{product} - Restock",
+                        min_value=0,
+                        key=f"{product}_restock",
+                        step=1000,
+                    )
+
+            if st.form_submit_button(
+                label="Calculate: Re-Stock Planning",
+                type="primary",
+                use_container_width=True,
+            ):
+                rental_size = get_session_value(rental_location, "rental_size", 0.00)
+
+                if rental_size > 0:
+                    with profiler.section("Re-Stock Percentage"):
+                        restock_percentage = engine.stock_percentage(
+                            product_info.dimension,
+                            [restock_values[product] for product in products],
+                            rental_size,
                         )
 
-                        if rental_size > 0:
-                            restock_size = []
-                            for product in products:
-                                restock_size.append(
-                                    st.session_state.store_location[rental_location][
-                                        "product"
-                                    ][product]["Product_Dimension"]
-                                    * restock_values[product]
-                                )
-                            restock_percentage = sum(restock_size) / rental_size * 100
-
-                            if restock_percentage <= 100:
-                                st.success(
-                                    f"Restock Percentage: {restock_percentage:.2f}%"
-                                )
-                            else:
-                                st.error(
-                                    f"Restock Percentage: {restock_percentage:.2f}%"
-                                )
+                    if restock_percentage <= 100:
+                        st.success(f"Restock Percentage: {restock_percentage:.2f}%")
+                    else:
+                        st.error(f"Restock Percentage: {restock_percentage:.2f}%")
 
-        with tab2:
-            with st.expander(label="COGS | Sales (Per-Product)"):
-                num_rows = 5
-                col1, col2 = st.columns(2)
-                with col1:
-                    SALES = {"Day": np.arange(1, num_rows + 1)}
-                    for product in products:
-                        SALES[f"{product}_Sales"] = np.zeros(num_rows)
-
-                with col2:
-                    COGS = {"Day": np.arange(1, num_rows + 1)}
-                    for product in products:
-                        COGS[f"{product}_COGS(Acc.)"] = np.zeros(num_rows)
-
-                COGS_SALE = {**SALES, **COGS}
-                COGS_SALE = pd.DataFrame(COGS_SALE)
-                COGS_SALE = st.data_editor(
-                    data=COGS_SALE, num_rows="dynamic", use_container_width=True
+        with st.form("RestockOptimiser"):
+            st.markdown(
+                "Best integer restock for the space left by the current stock, "
+                "using the Sales Velocity data and each product's shelf life."
+            )
+            planned_stock = get_session_value(rental_location, "planned_stock", {})
+            current_plan = schema.plan_table(
+                st.data_editor(
+                    data=pd.DataFrame(
+                        {
+                            "product": products,
+                            "Current_Stock": [
+                                planned_stock.get(product, 0) for product in products
+                            ],
+                        }
+                    ),
+                    disabled=["product"],
+                    hide_index=True,
+                    use_container_width=True,
+                ),
+                ["Current_Stock"],
+            )
+            col1, col2 = st.columns(2)
+            with col1:
+                restock_horizon = st.number_input(
+                    label="Days Until Next Restock", min_value=1, value=7
+                )
+            with col2:
+                all_locations = st.checkbox(
+                    label="Solve every location (current stock from each "
+                    "location's planned stock)"
                 )
 
-                if st.button(
-                    label="Visualize", type="primary", use_container_width=True
-                ):
-                    for product in products:
-                        COGS_SALE[f"{product}_COGS(Non-Acc.)"] = COGS_SALE[
-                            f"{product}_COGS(Acc.)"
-                        ].diff()
-
-                        COGS_SALE.loc[
-                            COGS_SALE.index[0], f"{product}_COGS(Non-Acc.)"
-                        ] = COGS_SALE.loc[COGS_SALE.index[0], f"{product}_COGS(Acc.)"]
-
-                    fig = px.line(
-                        data_frame=COGS_SALE,
-                        x="Day",
-                        y=[f"{product}_Sales" for product in products]
-                        + [f"{product}_COGS(Non-Acc.)" for product in products],
-                        markers=True,
+            if st.form_submit_button(
+                label="Optimise: Re-Stock",
+                type="primary",
+                use_container_width=True,
+            ):
+                if all_locations:
+                    with profiler.section("Re-Stock Optimiser"):
+                        store_location = st.session_state.store_location
+                        arrays = engine.build_location_arrays(store_location)
+                        plan = cached(
+                            "Re-Stock Optimiser",
+                            optimizer.optimise_restock,
+                            [
+                                [
+                                    store_location[location]
+                                    .get("planned_stock", {})
+                                    .get(product, 0)
+                                    for product in arrays.products
+                                ]
+                                for location in arrays.locations
+                            ],
+                            [
+                                location_velocity(location, arrays.products)
+                                for location in arrays.locations
+                            ],
+                            arrays.shelf_life,
+                            arrays.dimension,
+                            arrays.margin,
+                            arrays.rental_size,
+                            horizon=int(restock_horizon),
+                            products=arrays.products,
+                        )
+                    st.dataframe(
+                        pd.DataFrame(
+                            plan.quantities,
+                            columns=arrays.products,
+                            index=pd.Index(arrays.locations, name="location"),
+                        ).assign(
+                            Margin=plan.margin,
+                            **{"Stock Percentage": plan.stock_percentage},
+                        ),
+                        use_container_width=True,
+                    )
+                else:
+                    rental_size = get_session_value(
+                        rental_location, "rental_size", 0.00
                     )
-                    st.plotly_chart(figure_or_data=fig, use_container_width=True)
+                    if rental_size > 0:
+                        with profiler.section("Re-Stock Optimiser"):
+                            plan = cached(
+                                "Re-Stock Optimiser",
+                                optimizer.optimise_restock,
+                                current_plan["Current_Stock"].to_numpy(),
+                                location_velocity(rental_location, products),
+                                product_info.shelf_life,
+                                product_info.dimension,
+                                product_info.margin,
+                                rental_size,
+                                horizon=int(restock_horizon),
+                                products=products,
+                            )
+                        st.dataframe(
+                            plan.to_frame(), hide_index=True, use_container_width=True
+                        )
+                        if plan.stock_percentage <= 100:
+                            st.success(
+                                f"Margin: {plan.margin:,.2f} | "
+                                f"Stock Percentage: {plan.stock_percentage:.2f}%"
+                            )
+                        else:
+                            st.error(
+                                "The current stock already exceeds the rental size "
+                                f"({plan.stock_percentage:.2f}%)."
+                            )
+                    else:
+                        st.error("Rental Size must be greater than 0.")
 
-        with tab3:
-            with st.expander(label="Minimal Price Calculation"):
-                with st.form("MinimalPriceCalculation"):
-
-                    minimal_price = {}
-                    minimal_price["rental_size"] = st.number_input(
-                        label="Rental Size:",
-                        value=get_session_value(rental_location, "rental_size", 0.00),
-                        disabled=True,
+    with st.expander("Inventory Simulation"):
+        with st.form("InventorySimulation"):
+            col1, col2 = st.columns(2)
+            with col1:
+                simulation_days = st.number_input(
+                    label="Days", min_value=1, max_value=3650, value=30
+                )
+            with col2:
+                restock_every = st.number_input(
+                    label="Restock Every (Days)", min_value=1, value=7
+                )
+            simulation_plan = schema.plan_table(
+                st.data_editor(
+                    data=pd.DataFrame(
+                        {
+                            "product": products,
+                            "Initial_Stock": np.zeros(len(products)),
+                            "Restock": np.zeros(len(products)),
+                            "Daily_Demand": np.zeros(len(products)),
+                        }
+                    ),
+                    disabled=["product"],
+                    hide_index=True,
+                    use_container_width=True,
+                ),
+                ["Initial_Stock", "Restock", "Daily_Demand"],
+            )
+
+            if st.form_submit_button(
+                label="Simulate: Inventory",
+                type="primary",
+                use_container_width=True,
+            ):
+                with profiler.section("Inventory Simulation"):
+                    plan = schema.matrix(
+                        simulation_plan,
+                        ["Initial_Stock", "Restock", "Daily_Demand"],
                     )
-                    minimal_price["rental_cost"] = st.number_input(
-                        label="Rental Cost:",
-                        value=get_session_value(rental_location, "rental_cost", 0.00),
-                        disabled=True,
+                    result = cached(
+                        "Inventory Simulation",
+                        simulation.simulate_inventory,
+                        product_info.dimension,
+                        product_info.shelf_life,
+                        get_session_value(rental_location, "rental_size", 0.00),
+                        simulation.periodic_schedule(
+                            plan[:, 1], int(simulation_days), int(restock_every)
+                        ),
+                        plan[None, :, 2],
+                        overflow_fee=get_session_value(
+                            rental_location, "overflow_fee", 0.00
+                        ),
+                        initial_stock=plan[:, 0],
                     )
-                    if st.form_submit_button(
-                        label="Calculate: Minimal Price",
-                        type="primary",
-                        use_container_width=True,
-                    ):
-                        minimal_price["rental_size"] * minimal_price["rental_cost"]
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Lost Sales", f"{result.lost_sales.sum():,.0f}")
+                col2.metric("Waste", f"{result.waste.sum():,.0f}")
+                col3.metric("Overflow Cost", f"{result.overflow_cost.sum():,.2f}")
+                st.dataframe(
+                    pd.DataFrame(
+                        {
+                            "product": products,
+                            "Ending Stock": result.ending_stock,
+                            "Sold": result.sold,
+                            "Lost Sales": result.lost_sales,
+                            "Waste": result.waste,
+                            "Overflow Cost": result.overflow_cost,
+                        }
+                    ),
+                    hide_index=True,
+                    use_container_width=True,
+                )
 
-        with tab4:
-            with st.expander(label="Sales Velocity"):
-                df_sales = pd.DataFrame({"Day": []})
-                for product in products:
-                    df_sales[f"UnitSold - {product}"] = []
-                sales_editor = st.data_editor(
-                    data=df_sales, use_container_width=True, num_rows="dynamic"
+
+def cogs_series(table, location, products):
+    cogs_long = timeseries.to_long(
+        table, location, timeseries.TABLE_METRICS["cogs"], products
+    )
+    return timeseries.concat(
+        [
+            cogs_long[cogs_long["metric"] == "Sales"],
+            timeseries.deaccumulate(cogs_long),
+        ]
+    ).sort_values(["metric", "product", "day"], kind="stable")
+
+
+@st.fragment
+@profiler.timed("COGS | Sales")
+def cogs_sales(rental_location, products, product_info):
+    with st.expander(label="COGS | Sales (Per-Product)"):
+        table_importer(rental_location, "cogs", products)
+        COGS_SALE = get_table(rental_location, "cogs", products, num_rows=5)
+        COGS_SALE = schema.day_table(
+            st.data_editor(
+                data=COGS_SALE, num_rows="dynamic", use_container_width=True
+            ),
+            currency=ingest.currency_columns("cogs", products),
+        )
+
+        if st.button(label="Visualize", type="primary", use_container_width=True):
+            store_table(rental_location, "cogs", COGS_SALE)
+            with profiler.section("COGS De-accumulation"):
+                cogs_long = cached(
+                    "COGS De-accumulation",
+                    cogs_series,
+                    COGS_SALE,
+                    rental_location,
+                    products,
+                )
+
+            with profiler.section("COGS Figure"):
+                fig = charts.line_figure(
+                    cogs_long,
+                    x="day",
+                    y="value",
+                    color="product",
+                    line_dash="metric",
+                    max_points=st.session_state.chart_max_points,
+                    webgl=st.session_state.chart_webgl,
                 )
+            st.plotly_chart(figure_or_data=fig, use_container_width=True)
 
-                if st.button(
-                    label="Calculate: Sales Velocity",
-                    type="primary",
+
+@st.fragment
+@profiler.timed("Price Strategy")
+def price_strategy(rental_location, products, product_info):
+    with st.expander(label="Minimal Price Calculation"):
+        with st.form("MinimalPriceCalculation"):
+
+            minimal_price = {}
+            minimal_price["rental_size"] = st.number_input(
+                label="Rental Size:",
+                value=get_session_value(rental_location, "rental_size", 0.00),
+                disabled=True,
+            )
+            minimal_price["rental_cost"] = st.number_input(
+                label="Rental Cost:",
+                value=get_session_value(rental_location, "rental_cost", 0.00),
+                disabled=True,
+            )
+            minimal_price["overflow_fee"] = st.number_input(
+                label="Overflow Fee:",
+                value=get_session_value(rental_location, "overflow_fee", 0.00),
+                disabled=True,
+            )
+            price_plan = schema.plan_table(
+                st.data_editor(
+                    data=pd.DataFrame(
+                        {
+                            "product": products,
+                            "Stock": np.zeros(len(products)),
+                            "Expected_Sold": np.zeros(len(products)),
+                        }
+                    ),
+                    disabled=["product"],
+                    hide_index=True,
                     use_container_width=True,
-                ):
-                    for product in products:
-                        avg_sales = round(
-                            sum(sales_editor[f"UnitSold - {product}"])
-                            / max(sales_editor["Day"]),
-                            2,
+                ),
+                ["Stock", "Expected_Sold"],
+            )
+            if st.form_submit_button(
+                label="Calculate: Minimal Price",
+                type="primary",
+                use_container_width=True,
+            ):
+                with profiler.section("Break-Even Prices"):
+                    plan = schema.matrix(price_plan, ["Stock", "Expected_Sold"])
+                    pricing_args = (
+                        product_info.costs,
+                        product_info.dimension,
+                        plan[:, 0],
+                        plan[:, 1],
+                        minimal_price["rental_cost"],
+                        minimal_price["rental_size"],
+                        minimal_price["overflow_fee"],
+                    )
+                    break_even = cached(
+                        "Break-Even Prices", pricing.break_even_prices, *pricing_args
+                    )
+
+                if np.isfinite(break_even.average_price):
+                    st.success(
+                        f"Average Minimal Price: {break_even.average_price:.2f} (per-unit)"
+                    )
+                    st.dataframe(
+                        pd.DataFrame(
+                            {
+                                "product": products,
+                                "Minimal Price": break_even.min_price,
+                                "Initial_Price": product_info.price,
+                            }
+                        ),
+                        hide_index=True,
+                        use_container_width=True,
+                    )
+                    if break_even.overflow_volume > 0:
+                        st.warning(
+                            f"Overflow: {break_even.overflow_volume:.2f} volume units"
                         )
-                        st.info(f"Avg Sales - {product}: {avg_sales} (units per-day)")
 
-                        projection_days = [3, 5, 7, 14, 30]
-                        for days in projection_days:
-                            projected_sales = round(avg_sales * days, 2)
-                            st.markdown(
-                                f"Projected Sales - {product} in {days} days: {projected_sales} units"
+                    with profiler.section("Break-Even Surface"):
+                        demand_scale = np.linspace(0.25, 2.0, 50)
+                        stock_scale = np.linspace(0.25, 2.0, 50)
+                        surface = cached(
+                            "Break-Even Surface",
+                            pricing.break_even_surface,
+                            *pricing_args,
+                            demand_scale=demand_scale,
+                            stock_scale=stock_scale,
+                        )
+                    with profiler.section("Price Surface Figure"):
+                        fig = go.Figure(
+                            data=go.Heatmap(
+                                x=stock_scale * 100,
+                                y=demand_scale * 100,
+                                z=np.where(
+                                    np.isfinite(surface.average_price),
+                                    surface.average_price,
+                                    np.nan,
+                                ),
+                                colorbar={"title": "Min Price"},
                             )
+                        )
+                        fig.update_layout(
+                            title="Average Minimal Price Sensitivity",
+                            xaxis_title="Stock (% of plan)",
+                            yaxis_title="Expected Sold (% of plan)",
+                        )
+                    st.plotly_chart(fig, use_container_width=True)
+                else:
+                    st.error("Enter the stock and expected units sold first.")
 
-                        st.markdown("---")
 
-        with tab5:
-            with st.expander(label="Sales Comparison"):
-                num_rows = 5
-                col1, col2 = st.columns(2)
-                with col1:
-                    SALES_BEFORE = {"Day": np.arange(1, num_rows + 1)}
-                    for product in products:
-                        SALES_BEFORE[f"{product}_UnitSold-Before"] = np.zeros(num_rows)
-                with col2:
-                    SALES_AFTER = {"Day": np.arange(1, num_rows + 1)}
-                    for product in products:
-                        SALES_AFTER[f"{product}_UnitSold-After"] = np.zeros(num_rows)
-
-                SALES_DATA = {**SALES_BEFORE, **SALES_AFTER}
-                SALES_DATA = pd.DataFrame(SALES_DATA)
-                SALES_DATA = st.data_editor(
-                    data=SALES_DATA, num_rows="dynamic", use_container_width=True
+@st.fragment
+@profiler.timed("Price Optimisation")
+def price_optimisation(rental_location, products, product_info):
+    with st.expander(label="Price Optimisation"):
+        st.markdown(
+            "Record the selling price and units sold of every product per day; "
+            "a demand curve is fitted per product from this history."
+        )
+        table_importer(rental_location, "pricing", products)
+        price_history = get_table(rental_location, "pricing", products, num_rows=5)
+        price_history = schema.day_table(
+            st.data_editor(
+                data=price_history, num_rows="dynamic", use_container_width=True
+            ),
+            currency=ingest.currency_columns("pricing", products),
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            price_range = st.slider(
+                label="Candidate Prices (% of Initial Price)",
+                min_value=10,
+                max_value=500,
+                value=(50, 200),
+                step=5,
+            )
+        with col2:
+            period_days = st.number_input(
+                label="Rent Period (days)", min_value=1, value=30
+            )
+
+        if st.button(
+            label="Optimise: Prices", type="primary", use_container_width=True
+        ):
+            store_table(rental_location, "pricing", price_history)
+            with profiler.section("Price Optimisation"):
+                fit = cached(
+                    "Elasticity Fit",
+                    pricing.fit_elasticity,
+                    schema.matrix(
+                        price_history,
+                        [f"{product}_Price" for product in products],
+                        schema.CURRENCY_DTYPE,
+                    ),
+                    schema.matrix(
+                        price_history, [f"{product}_Demand" for product in products]
+                    ),
+                )
+                recommendation = cached(
+                    "Price Optimisation",
+                    pricing.optimise_prices,
+                    product_info.costs,
+                    fit.elasticity,
+                    fit.scale,
+                    product_info.price,
+                    rental_cost=get_session_value(rental_location, "rental_cost", 0.0),
+                    period_days=period_days,
+                    multipliers=np.linspace(
+                        price_range[0] / 100,
+                        price_range[1] / 100,
+                        int(price_range[1] - price_range[0]) * 2 + 1,
+                    ),
                 )
 
-                if st.button(
-                    label="Compare: Sales-Marketing",
-                    type="primary",
+            st.dataframe(
+                pd.DataFrame(
+                    {
+                        "Elasticity": fit.elasticity,
+                        "R²": fit.r_squared,
+                        "Observations": fit.observations,
+                        "Initial Price": product_info.price,
+                        "Recommended Price": recommendation.price,
+                        "Expected Units/Day": recommendation.units,
+                        "Profit/Day": recommendation.profit,
+                        "At Range Limit": recommendation.at_bound,
+                    },
+                    index=pd.Index(products, name="Product"),
+                ).round(3),
+                use_container_width=True,
+            )
+            st.success(
+                f"Profit over {period_days} days after rent: "
+                f"{recommendation.location_profit:,.2f}"
+            )
+            if not np.isfinite(fit.elasticity).all():
+                st.info(
+                    "Products without at least two different prices with sales "
+                    "keep their Initial Price."
+                )
+
+
+@st.fragment
+@profiler.timed("Sales Velocity Tab")
+def sales_velocity(rental_location, products, product_info):
+    with st.expander(label="Sales Velocity"):
+        table_importer(rental_location, "velocity", products)
+        df_sales = get_table(rental_location, "velocity", products)
+        sales_editor = schema.day_table(
+            st.data_editor(data=df_sales, use_container_width=True, num_rows="dynamic")
+        )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            velocity_window = st.number_input(
+                label="Rolling Window (Days)", min_value=1, value=7
+            )
+        with col2:
+            velocity_halflife = st.number_input(
+                label="EWMA Half-Life (Days)", min_value=0.5, value=7.0, step=0.5
+            )
+
+        if st.button(
+            label="Calculate: Sales Velocity",
+            type="primary",
+            use_container_width=True,
+        ):
+            store_table(rental_location, "velocity", sales_editor)
+            with profiler.section("Sales Velocity"):
+                # Rows appended after the last analysed day are folded into
+                # the previous state instead of re-reading the whole history.
+                state_key = f"{rental_location}_velocity_forecast"
+                st.session_state[state_key] = forecast.advance(
+                    st.session_state.get(state_key),
+                    schema.matrix(
+                        sales_editor,
+                        [f"UnitSold - {product}" for product in products],
+                    ),
+                    schema.days(sales_editor),
+                    window=velocity_window,
+                    halflife=velocity_halflife,
+                )
+                velocity_forecast = forecast.forecast(
+                    st.session_state[state_key], products, engine.PROJECTION_DAYS
+                )
+            st.dataframe(
+                velocity_forecast.to_frame().round(2), use_container_width=True
+            )
+            st.caption(
+                "Projections start from the EWMA velocity and follow the trend "
+                f"of the last {int(velocity_window)} days, never below zero."
+            )
+
+    with st.expander(label="Monte Carlo Simulation"):
+        with st.form("MonteCarloSimulation"):
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                mc_days = st.number_input(
+                    label="Days", min_value=1, max_value=365, value=30
+                )
+            with col2:
+                mc_restock_every = st.number_input(
+                    label="Restock Every (Days)", min_value=1, value=7
+                )
+            with col3:
+                mc_paths = st.number_input(
+                    label="Paths",
+                    min_value=1_000,
+                    max_value=1_000_000,
+                    value=100_000,
+                    step=10_000,
+                )
+            with col4:
+                mc_seed = st.number_input(label="Seed", min_value=0, value=0)
+            mc_plan = schema.plan_table(
+                st.data_editor(
+                    data=pd.DataFrame(
+                        {
+                            "product": products,
+                            "Initial_Stock": np.zeros(len(products)),
+                            "Restock": np.zeros(len(products)),
+                        }
+                    ),
+                    disabled=["product"],
+                    hide_index=True,
                     use_container_width=True,
-                ):
-                    before_sales = []
-                    after_sales = []
-                    product_names = []
-
-                    for product in products:
-                        before_column = f"{product}_UnitSold-Before"
-                        after_column = f"{product}_UnitSold-After"
-
-                        if (
-                            before_column in SALES_DATA.columns
-                            and after_column in SALES_DATA.columns
-                        ):
-                            before = SALES_DATA[before_column].sum()
-                            after = SALES_DATA[after_column].sum()
-
-                            before_sales.append(before)
-                            after_sales.append(after)
-                            product_names.append(product)
-
-                    fig = go.Figure(
-                        data=[
-                            go.Bar(name="Before", x=product_names, y=before_sales),
-                            go.Bar(name="After", x=product_names, y=after_sales),
-                        ]
+                ),
+                ["Initial_Stock", "Restock"],
+            )
+
+            if st.form_submit_button(
+                label="Simulate: Monte Carlo",
+                type="primary",
+                use_container_width=True,
+            ):
+                history = schema.matrix(
+                    sales_editor,
+                    [f"UnitSold - {product}" for product in products],
+                )
+                if len(history):
+                    plan = schema.matrix(mc_plan, ["Initial_Stock", "Restock"])
+                    mc_inputs = {
+                        "history": history,
+                        "dimension": product_info.dimension,
+                        "shelf_life": product_info.shelf_life,
+                        "rental_size": get_session_value(
+                            rental_location, "rental_size", 0.00
+                        ),
+                        "restock": simulation.periodic_schedule(
+                            plan[:, 1], int(mc_days), int(mc_restock_every)
+                        ),
+                        "overflow_fee": get_session_value(
+                            rental_location, "overflow_fee", 0.00
+                        ),
+                        "initial_stock": plan[:, 0],
+                        "paths": int(mc_paths),
+                        # In-process: the job runner's bounded thread pool
+                        # caps how many simulations run at once.
+                        "workers": 1,
+                        "seed": int(mc_seed),
+                    }
+                    # Runs in the background; a new submit cancels the stale job.
+                    job = job_runner().submit(
+                        jobs.input_key("montecarlo", mc_inputs),
+                        montecarlo.run_monte_carlo,
+                        group=(session_id, rental_location, "montecarlo"),
+                        **mc_inputs,
+                    )
+                    st.session_state[f"{rental_location}_montecarlo_job"] = (
+                        job.key,
+                        products,
+                    )
+                    st.rerun()
+                else:
+                    st.error("Enter the sales history in Sales Velocity first.")
+
+
+def show_stock_search(state_key, search):
+    if len(search.quantities):
+        if not search.exact:
+            st.warning(
+                "Too many products for an exhaustive search: "
+                "similar mixes were merged, so these mixes are "
+                "close to, but not guaranteed to be, the best."
+            )
+        st.dataframe(search.to_frame(), use_container_width=True)
+    else:
+        st.error("No stock mix fits into the rental size.")
+
+
+def show_monte_carlo(state_key, result):
+    job_products = st.session_state[state_key][1]
+    st.metric("Overflow Probability", f"{result.overflow_probability:.1%}")
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "product": job_products,
+                "Stockout Probability": result.stockout_probability,
+                "Waste Probability": result.waste_probability,
+                "Expected Lost Sales": result.expected_lost_sales,
+                "Expected Waste": result.expected_waste,
+            }
+        ),
+        hide_index=True,
+        use_container_width=True,
+    )
+
+
+def marketing_comparison(table, location, products):
+    return timeseries.compare(
+        timeseries.to_long(
+            table, location, timeseries.TABLE_METRICS["marketing"], products
+        )
+    )
+
+
+@st.fragment
+@profiler.timed("Marketing Evaluation")
+def marketing_evaluation(rental_location, products, product_info):
+    with st.expander(label="Sales Comparison"):
+        table_importer(rental_location, "marketing", products)
+        SALES_DATA = get_table(rental_location, "marketing", products, num_rows=5)
+        SALES_DATA = schema.day_table(
+            st.data_editor(
+                data=SALES_DATA, num_rows="dynamic", use_container_width=True
+            ),
+            blank=ingest.blank_value("marketing"),
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            resamples = st.number_input(
+                label="Bootstrap Resamples",
+                min_value=1000,
+                max_value=100_000,
+                value=10_000,
+                step=1000,
+            )
+        with col2:
+            confidence = st.slider(
+                label="Confidence Level",
+                min_value=0.80,
+                max_value=0.99,
+                value=0.95,
+                step=0.01,
+            )
+
+        if st.button(
+            label="Compare: Sales-Marketing",
+            type="primary",
+            use_container_width=True,
+        ):
+            store_table(rental_location, "marketing", SALES_DATA)
+            product_names = [
+                product
+                for product in products
+                if f"{product}_UnitSold-Before" in SALES_DATA.columns
+                and f"{product}_UnitSold-After" in SALES_DATA.columns
+            ]
+            with profiler.section("Marketing Comparison"):
+                comparison = cached(
+                    "Marketing Comparison",
+                    marketing_comparison,
+                    SALES_DATA,
+                    rental_location,
+                    product_names,
+                ).droplevel("location")
+                before_sales = comparison["Before"].to_numpy()
+                after_sales = comparison["After"].to_numpy()
+                product_names = comparison.index.astype(str).tolist()
+                uneven = comparison.index[
+                    comparison["Before Days"] != comparison["After Days"]
+                ]
+
+            with profiler.section("Comparison Figure"):
+                fig = go.Figure(
+                    data=[
+                        go.Bar(name="Before", x=product_names, y=before_sales),
+                        go.Bar(name="After", x=product_names, y=after_sales),
+                    ]
+                )
+
+                # Update layout
+                fig.update_layout(
+                    title="Sales Comparison Before and After Marketing",
+                    xaxis_title="Products",
+                    yaxis_title="Units Sold",
+                    barmode="group",
+                )
+
+            # Display the chart
+            st.plotly_chart(fig, use_container_width=True)
+            if len(uneven):
+                st.warning(
+                    "The before and after windows have a different number of "
+                    f"days for {', '.join(map(str, uneven))}: compare their "
+                    "per-day means below rather than the totals above."
+                )
+
+            if len(SALES_DATA) and product_names:
+                with profiler.section("Lift Significance"):
+                    lift_test = cached(
+                        "Lift Significance",
+                        stats.bootstrap_lift,
+                        schema.matrix(
+                            SALES_DATA,
+                            [f"{product}_UnitSold-Before" for product in product_names],
+                            blank=np.nan,
+                        ),
+                        schema.matrix(
+                            SALES_DATA,
+                            [f"{product}_UnitSold-After" for product in product_names],
+                            blank=np.nan,
+                        ),
+                        resamples=int(resamples),
+                        confidence=confidence,
+                        products=product_names,
                     )
+                lift_table = lift_test.to_frame().round(3)
+                lift_table["Significant"] = lift_test.p_value < 1 - confidence
+                st.dataframe(lift_table, use_container_width=True)
+                st.caption(
+                    f"Lift per day with {lift_test.resamples:,} bootstrap resamples "
+                    f"of each product's non-blank before and after days; "
+                    f"significance is tested at the {confidence:.0%} level."
+                )
+
+
+if "store_location" not in st.session_state:
+    st.session_state.store_location = (
+        location_store.load_records() if location_store is not None else {}
+    )
 
-                    # Update layout
-                    fig.update_layout(
-                        title="Sales Comparison Before and After Marketing",
-                        xaxis_title="Products",
-                        yaxis_title="Units Sold",
-                        barmode="group",
+with profiler.section("Sidebar"):
+    with st.sidebar:
+        if location_store is not None:
+            st.caption(
+                "Locations are saved to a single-user store shared by every "
+                "session of this server."
+            )
+        with st.expander("Input Locations & Category"):
+            locations = st.text_area(
+                "Enter location names (one per line)", "Jakarta\nSingapore\nBangkok"
+            ).split("\n")
+
+            locations = [loc.strip() for loc in locations if loc.strip()]
+
+            category = st.selectbox(
+                label="Product Configuration",
+                options=product_catalog.categories,
+                key="category_selector",
+            )
+
+            if st.button(label="Apply Data", type="primary", use_container_width=True):
+                for location in locations:
+                    # Only the category name is stored; edits become overrides.
+                    st.session_state.store_location.get(location, {}).pop(
+                        "product", None
+                    )
+                    update_session_state(
+                        location,
+                        {
+                            "category": category,
+                            "overrides": {},
+                            "removed": [],
+                            "status": False,
+                        },
                     )
+                st.success(f"Configuration applied successfully!")
 
-                    # Display the chart
-                    st.plotly_chart(fig, use_container_width=True)
+    with st.sidebar:
+        st.markdown(body="---")
+        if st.session_state.store_location:
+            rental_location = st.selectbox(
+                "Retail Location", list(st.session_state.store_location.keys())
+            )
+        else:
+            rental_location = None
+
+        with st.expander("Chart Settings"):
+            st.toggle(label="WebGL Rendering", key="chart_webgl")
+            st.number_input(
+                label="Max Points per Chart",
+                min_value=100,
+                value=2000,
+                step=500,
+                key="chart_max_points",
+            )
+
+
+if rental_location:
+    retail_information(rental_location)
+
+    with profiler.section("Product Arrays"):
+        product_info = cached(
+            "Product Arrays",
+            engine.product_arrays,
+            catalog.effective_products(
+                st.session_state.store_location[rental_location], product_catalog
+            ),
+        )
+        products = product_info.products
+
+    if st.session_state.store_location[rental_location]["status"] == True:
+        tab1, tab2, tab3, tab4, tab5 = st.tabs(
+            [
+                "Capacity Planning",
+                "COGS | Sales",
+                "Price Strategy",
+                "Sales Velocity",
+                "Marketing Evaluation",
+            ]
+        )
+
+        with tab1:
+            capacity_planning(rental_location, products, product_info)
+            show_job(
+                f"{rental_location}_stock_search_job",
+                "Optimal stock search",
+                show_stock_search,
+            )
+
+        with tab2:
+            cogs_sales(rental_location, products, product_info)
+            show_job(f"{rental_location}_cogs_import_job", "Import", show_import)
+
+        with tab3:
+            price_strategy(rental_location, products, product_info)
+            price_optimisation(rental_location, products, product_info)
+            show_job(f"{rental_location}_pricing_import_job", "Import", show_import)
+
+        with tab4:
+            sales_velocity(rental_location, products, product_info)
+            show_job(f"{rental_location}_velocity_import_job", "Import", show_import)
+            show_job(
+                f"{rental_location}_montecarlo_job",
+                "Monte Carlo simulation",
+                show_monte_carlo,
+            )
+
+        with tab5:
+            marketing_evaluation(rental_location, products, product_info)
+            show_job(f"{rental_location}_marketing_import_job", "Import", show_import)
 
 else:
     st.error(body="Input Location & Category First")
@@ -472,6 +1266,46 @@ else:
 with st.sidebar:
     try:
         with st.expander(label=f"JSON-{rental_location}"):
-            st.json(st.session_state.store_location[rental_location])
+            with profiler.section("Session JSON"):
+                state_viewer(
+                    rental_location,
+                    st.session_state.store_location[rental_location],
+                )
     except KeyError:
         st.error(body="Input Location & Category First")
+
+profiler.record("Script", time.perf_counter() - run_started)
+
+with st.sidebar:
+    with st.expander("Result Cache"):
+        shared_cache = result_cache()
+        st.caption(
+            f"{len(shared_cache)} results, {shared_cache.nbytes / 2**20:.1f} MiB, "
+            "shared by all sessions"
+        )
+        st.dataframe(shared_cache.stats(), use_container_width=True)
+        if st.button(label="Clear Cache", use_container_width=True):
+            shared_cache.clear()
+
+with st.sidebar:
+    with st.expander("Profiler"):
+        st.toggle(
+            label="Enable Profiling",
+            value=profiling.enabled_by_env(),
+            key="profiling_enabled",
+        )
+        if profiler.enabled:
+            st.dataframe(profiler.summary(), hide_index=True, use_container_width=True)
+            if st.button(label="Dump Profile", use_container_width=True):
+                path = profiler.dump(
+                    os.path.join(
+                        os.environ.get("RETAIL_PROFILE_DIR", "profiles"),
+                        f"profile-{time.strftime('%Y%m%d-%H%M%S')}.json",
+                    ),
+                    context={
+                        "location": rental_location,
+                        "locations": len(st.session_state.store_location),
+                        "products": len(products) if rental_location else 0,
+                    },
+                )
+                st.success(f"Profile written to {path}")
@@ -0,0 +1,86 @@
+import streamlit as st
+import plotly.graph_objects as go
+
+from retail import dashboard, persistence
+
+st.set_page_config(
+    page_title="Retail Dashboard",
+    page_icon="📊",
+    layout="wide",
+    initial_sidebar_state="expanded",
+)
+
+st.title("All Locations")
+
+if "store_location" not in st.session_state:
+    location_store = persistence.shared()
+    st.session_state.store_location = (
+        location_store.load_records() if location_store is not None else {}
+    )
+store_location = st.session_state.store_location
+if not store_location:
+    st.info("Apply a product configuration in the Retail Module first.")
+    st.stop()
+
+if "dashboard_cache" not in st.session_state:
+    st.session_state.dashboard_cache = dashboard.DashboardCache()
+cache = st.session_state.dashboard_cache
+metrics = cache.frame(store_location)
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Locations", len(metrics))
+col2.metric("Planned Margin", f"{metrics['planned_margin'].sum():,.0f}")
+col3.metric("Units Sold / Day", f"{metrics['velocity'].sum():,.2f}")
+col4.metric(
+    "Over Capacity", int((metrics["utilisation_pct"] > 100).sum()), delta_color="off"
+)
+
+sort_by = st.selectbox(
+    label="Sort By",
+    options=dashboard.COLUMNS,
+    index=dashboard.COLUMNS.index("utilisation_pct"),
+)
+top_n = st.number_input(
+    label="Locations in Chart",
+    min_value=1,
+    max_value=max(len(metrics), 1),
+    value=min(len(metrics), 30),
+)
+ordered = metrics.sort_values(sort_by, ascending=False, na_position="last")
+
+st.dataframe(
+    ordered,
+    use_container_width=True,
+    column_config={
+        "products": st.column_config.NumberColumn("Products"),
+        "rental_size": st.column_config.NumberColumn("Rental Size", format="%.2f"),
+        "planned_volume": st.column_config.NumberColumn(
+            "Planned Volume", format="%.2f"
+        ),
+        "utilisation_pct": st.column_config.ProgressColumn(
+            "Utilisation (%)", format="%.2f", min_value=0, max_value=100
+        ),
+        "planned_margin": st.column_config.NumberColumn(
+            "Planned Margin", format="%.0f"
+        ),
+        "unit_margin_pct": st.column_config.NumberColumn(
+            "Unit Margin (%)", format="%.2f"
+        ),
+        "velocity": st.column_config.NumberColumn("Units / Day", format="%.2f"),
+        "lift_pct": st.column_config.NumberColumn("Marketing Lift (%)", format="%.2f"),
+    },
+)
+
+chart = ordered.head(int(top_n))
+fig = go.Figure(go.Bar(x=chart.index.astype(str), y=chart[sort_by], name=sort_by))
+fig.update_layout(
+    title=f"Top {len(chart)} Locations by {sort_by}", xaxis_title="Location"
+)
+st.plotly_chart(fig, use_container_width=True)
+
+st.caption(
+    f"Recomputed {cache.recomputed} of {len(metrics)} locations on this run. "
+    "Utilisation and planned margin use the quantities from the last "
+    "'Calculate: Optimal Stock'; velocity and lift use the tables last "
+    "analysed in each location."
+)
@@ -0,0 +1 @@
+"""Streamlit-free analytics used by the Retail Module pages."""
@@ -0,0 +1,287 @@
+"""Headless batch analysis of many locations.
+
+Runs the capacity, restock, COGS, sales-velocity, marketing and pricing
+analyses of the Retail Module page for every location listed in a JSON
+config, fanning the locations out across a process pool, and writes one
+consolidated report as JSON and CSV::
+
+    python -m retail.batch config.json --output report --workers 8
+
+Config layout (see ``examples/batch_config.json``)::
+
+    {
+      "products": {"Apple Juice": {"Costs": 15, ...}, ...},
+      "tables": {"velocity": "all_locations_sales.csv"},
+      "locations": [
+        {
+          "name": "Jakarta",
+          "rental_size": 100, "rental_cost": 5000, "overflow_fee": 2,
+          "planned_stock": {"Apple Juice": 3000},
+          "restock": {"Apple Juice": 1000},
+          "tables": {"cogs": "jakarta_cogs.csv", "marketing": [{"Day": 1, ...}]}
+        }
+      ]
+    }
+
+Top-level ``products`` and ``tables`` apply to every location; a location's
+own entries take precedence. Instead of ``products`` a top-level or location
+``category`` picks a category of the product catalog (``catalog`` in the
+config, ``$RETAIL_CATALOG`` or ``data/catalog.csv``). Tables are CSV/Parquet
+paths (relative to the config file, split by an optional ``Location``
+column) or inline records.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from retail import catalog, engine, ingest, optimizer, pricing, schema, timeseries
+
+
+def _json_value(value):
+    if isinstance(value, (np.generic, np.ndarray)) and np.ndim(value) == 0:
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+def load_config(path):
+    """Read ``path`` and resolve every location's products and tables."""
+    with open(path) as file:
+        config = json.load(file)
+    base = os.path.dirname(os.path.abspath(path))
+    product_catalog = None
+
+    def category(name):
+        nonlocal product_catalog
+        if product_catalog is None:
+            catalog_path = config.get("catalog")
+            product_catalog = catalog.load(
+                os.path.join(base, catalog_path) if catalog_path else None
+            )
+        return product_catalog.category(name)
+
+    default_products = config.get("products")
+    if default_products is None:
+        default_products = category(config["category"]) if "category" in config else {}
+    locations = []
+    for entry in config["locations"]:
+        location = dict(entry)
+        if "products" not in location and "category" in location:
+            location["products"] = category(location["category"])
+        location.setdefault("products", default_products)
+        location["tables"] = dict(location.get("tables", {}))
+        locations.append(location)
+
+    # Shared files are read once and split by their Location column.
+    by_name = {location["name"]: location for location in locations}
+    for kind, source in config.get("tables", {}).items():
+        products = list(default_products)
+        for name, table in _read_source(source, kind, products, base, None).items():
+            if name in by_name:
+                by_name[name]["tables"].setdefault(kind, table)
+
+    for location in locations:
+        for kind, source in list(location["tables"].items()):
+            if not isinstance(source, pd.DataFrame):
+                tables = _read_source(
+                    source, kind, list(location["products"]), base, location["name"]
+                )
+                location["tables"][kind] = tables.get(location["name"])
+    return locations
+
+
+def _read_source(source, kind, products, base, default_location):
+    if isinstance(source, list):
+        table = pd.DataFrame(source)
+        return {default_location: ingest.typed_table(table, kind, products)}
+    path = os.path.join(base, source)
+    return ingest.read_table(
+        path,
+        kind,
+        products,
+        file_format=ingest.file_format(path),
+        default_location=default_location,
+    )
+
+
+def analyse_location(location):
+    """Run every analysis for one resolved location config."""
+    name = location["name"]
+    products = list(location["products"])
+    info = engine.product_arrays(location["products"], products)
+    rental_size = float(location.get("rental_size", 0.0))
+    planned = np.array(
+        [location.get("planned_stock", {}).get(p, 0) for p in products], dtype=float
+    )
+    restock = np.array(
+        [location.get("restock", {}).get(p, 0) for p in products], dtype=float
+    )
+
+    summary = {
+        "location": name,
+        "rental_size": rental_size,
+        "rental_cost": float(location.get("rental_cost", 0.0)),
+        "overflow_fee": float(location.get("overflow_fee", 0.0)),
+        "stock_percentage": engine.stock_percentage(
+            info.dimension, planned, rental_size
+        ),
+        "restock_percentage": engine.stock_percentage(
+            info.dimension, restock, rental_size
+        ),
+    }
+    table = pd.DataFrame(
+        {
+            "location": name,
+            "product": products,
+            "unit_margin": info.price - info.costs,
+            "planned_stock": planned,
+            "restock": restock,
+        }
+    )
+
+    if rental_size > 0 and products:
+        search = optimizer.search_optimal_stock(
+            info.dimension,
+            info.margin,
+            rental_size,
+            optimizer.STOCK_OPTIONS,
+            top_k=1,
+            products=products,
+        )
+        if len(search.quantities):
+            table["optimal_stock"] = search.quantities[0]
+            summary["optimal_margin"] = search.margin[0]
+            summary["optimal_stock_percentage"] = search.stock_percentage[0]
+
+    tables = location["tables"]
+    if tables.get("cogs") is not None:
+        long = timeseries.to_long(
+            tables["cogs"], name, timeseries.TABLE_METRICS["cogs"], products
+        )
+        long = timeseries.concat([long, timeseries.deaccumulate(long)])
+        totals = timeseries.totals(long, ["Sales", "COGS(Non-Acc.)"]).loc[name]
+        table["sales_total"] = totals["Sales"].reindex(products).to_numpy()
+        table["cogs_total"] = totals["COGS(Non-Acc.)"].reindex(products).to_numpy()
+
+    if tables.get("velocity") is not None:
+        sales = tables["velocity"]
+        velocity = engine.sales_velocity(
+            schema.matrix(sales, ingest.table_columns("velocity", products)[1:]),
+            schema.days(sales),
+        )
+        table["velocity"] = velocity
+        projections = engine.project_sales(velocity, engine.PROJECTION_DAYS)
+        for j, days in enumerate(engine.PROJECTION_DAYS):
+            table[f"projected_{days}d"] = projections[:, j]
+
+    if tables.get("marketing") is not None:
+        comparison = timeseries.compare(
+            timeseries.to_long(
+                tables["marketing"],
+                name,
+                timeseries.TABLE_METRICS["marketing"],
+                products,
+            )
+        ).loc[name]
+        for column, key in [
+            ("Before", "sales_before"),
+            ("After", "sales_after"),
+            ("Before Days", "days_before"),
+            ("After Days", "days_after"),
+            ("Change", "sales_change"),
+            ("Change (%)", "sales_change_pct"),
+        ]:
+            table[key] = comparison[column].reindex(products).to_numpy()
+
+    if tables.get("pricing") is not None:
+        history = tables["pricing"]
+        fit = pricing.fit_elasticity(
+            schema.matrix(
+                history, [f"{p}_Price" for p in products], schema.CURRENCY_DTYPE
+            ),
+            schema.matrix(history, [f"{p}_Demand" for p in products]),
+        )
+        recommendation = pricing.optimise_prices(
+            info.costs,
+            fit.elasticity,
+            fit.scale,
+            info.price,
+            rental_cost=summary["rental_cost"],
+        )
+        table["elasticity"] = fit.elasticity
+        table["recommended_price"] = recommendation.price
+        table["recommended_profit_per_day"] = recommendation.profit
+        summary["recommended_profit_30d"] = recommendation.location_profit
+
+    return {key: _json_value(value) for key, value in summary.items()}, table
+
+
+def run_batch(locations, workers=None):
+    """Analyse ``locations`` in parallel; returns ``(summaries, products)``."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(locations) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(locations)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            results = list(
+                pool.map(
+                    analyse_location,
+                    locations,
+                    chunksize=max(len(locations) // (workers * 4), 1),
+                )
+            )
+    else:
+        results = [analyse_location(location) for location in locations]
+    summaries = [summary for summary, _ in results]
+    products = pd.concat([table for _, table in results], ignore_index=True)
+    return summaries, products
+
+
+def write_report(summaries, products, output):
+    """Write ``{output}.json`` (nested) and ``{output}.csv`` (per product)."""
+    directory = os.path.dirname(os.path.abspath(output))
+    os.makedirs(directory, exist_ok=True)
+    products.to_csv(f"{output}.csv", index=False)
+    report = []
+    for summary in summaries:
+        rows = products[products["location"] == summary["location"]]
+        records = [
+            {key: _json_value(value) for key, value in row.items() if key != "location"}
+            for row in rows.to_dict(orient="records")
+        ]
+        report.append({**summary, "products": records})
+    with open(f"{output}.json", "w") as file:
+        json.dump({"locations": report}, file, indent=2)
+    return f"{output}.json", f"{output}.csv"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m retail.batch", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("config", help="JSON config listing the locations")
+    parser.add_argument("--output", default="report", help="report path prefix")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="processes (default: all CPUs)"
+    )
+    args = parser.parse_args(argv)
+
+    locations = load_config(args.config)
+    summaries, products = run_batch(locations, workers=args.workers)
+    for path in write_report(summaries, products, args.output):
+        print(f"wrote {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Content-addressed result cache shared by every session.
+
+Results are stored under ``(namespace, hash of the inputs)``, where the hash
+is :func:`retail.jobs.input_key` over the arguments (arrays, frames, dicts
+and scalars), so an analysis is only recomputed when one of its inputs
+actually changed, whichever session or location asked first. Entries are
+evicted least recently used once ``max_entries`` or ``max_bytes`` is
+exceeded. Hit, miss and eviction counters are kept per namespace.
+
+Cached results are shared; callers must not modify them in place.
+"""
+
+import dataclasses
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from retail.jobs import input_key
+
+
+def _nbytes(value):
+    """Rough in-memory size of arrays and frames inside ``value``."""
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return sum(
+            _nbytes(getattr(value, field.name)) for field in dataclasses.fields(value)
+        )
+    if isinstance(value, dict):
+        return sum(_nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(item) for item in value)
+    return 64
+
+
+class ResultCache:
+    """Thread-safe LRU of analysis results keyed by input content."""
+
+    def __init__(self, max_entries=512, max_bytes=256 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _counter(self, namespace):
+        return self._stats.setdefault(
+            namespace, {"hits": 0, "misses": 0, "evictions": 0, "seconds": 0.0}
+        )
+
+    def call(self, namespace, function, *args, **kwargs):
+        """``function(*args, **kwargs)``, reused while the inputs are unchanged."""
+        key = (namespace, input_key(args, kwargs))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._counter(namespace)["hits"] += 1
+                return self._entries[key][0]
+            self._counter(namespace)["misses"] += 1
+
+        started = time.perf_counter()
+        value = function(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        size = _nbytes(value)
+        with self._lock:
+            self._counter(namespace)["seconds"] += elapsed
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self._bytes += size
+                self._evict()
+        return value
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            (namespace, _), (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._counter(namespace)["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Counters per namespace, with the hit rate and cached entries."""
+        with self._lock:
+            entries = {}
+            for namespace, _ in self._entries:
+                entries[namespace] = entries.get(namespace, 0) + 1
+            rows = [
+                dict(counter, namespace=namespace, entries=entries.get(namespace, 0))
+                for namespace, counter in self._stats.items()
+            ]
+        frame = pd.DataFrame(
+            rows,
+            columns=["namespace", "hits", "misses", "evictions", "entries", "seconds"],
+        ).set_index("namespace")
+        calls = frame["hits"] + frame["misses"]
+        frame["hit_rate"] = (frame["hits"] / calls.where(calls > 0)).round(3)
+        return frame
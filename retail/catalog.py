@@ -0,0 +1,178 @@
+"""File-backed product catalog.
+
+The catalog is a flat table with one row per product, read from
+``data/catalog.csv`` or the CSV/Parquet file named by ``RETAIL_CATALOG``::
+
+    Category,Product,Costs,Initial_Price,Shelf_Life,Product_Dimension
+    Juices,Apple Juice,15,26,30,0.0033
+
+Rows are stored as one array per field, grouped by category, so a category
+is a contiguous slice and lookups by category or product are dict hits.
+
+Locations do not copy a category. A location record holds the ``category``
+name plus the ``overrides`` (changed fields, or all fields of an added
+product) and ``removed`` products from the location's own edits;
+:func:`effective_products` merges them on demand. Records with a full
+``product`` dict, e.g. from older sessions, are used as they are.
+"""
+
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+
+PRODUCT_FIELDS = ("Costs", "Initial_Price", "Shelf_Life", "Product_Dimension")
+ENV_PATH = "RETAIL_CATALOG"
+DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "catalog.csv"
+)
+CATEGORY_COLUMN = "Category"
+PRODUCT_COLUMN = "Product"
+
+
+class Catalog:
+    """Products of every category as per-field arrays."""
+
+    def __init__(self, frame):
+        missing = [
+            column
+            for column in (CATEGORY_COLUMN, PRODUCT_COLUMN) + tuple(PRODUCT_FIELDS)
+            if column not in frame.columns
+        ]
+        if missing:
+            raise ValueError(f"catalog is missing columns: {', '.join(missing)}")
+        frame = frame.astype({CATEGORY_COLUMN: str, PRODUCT_COLUMN: str})
+        duplicated = frame.duplicated([CATEGORY_COLUMN, PRODUCT_COLUMN])
+        if duplicated.any():
+            first = frame[duplicated].iloc[0]
+            raise ValueError(
+                f"duplicate product {first[PRODUCT_COLUMN]!r} "
+                f"in category {first[CATEGORY_COLUMN]!r}"
+            )
+
+        # Stable sort keeps the file order inside and between categories.
+        self.categories = tuple(pd.unique(frame[CATEGORY_COLUMN]))
+        order = pd.Categorical(frame[CATEGORY_COLUMN], categories=self.categories)
+        frame = frame.iloc[np.argsort(order.codes, kind="stable")]
+
+        self.products = frame[PRODUCT_COLUMN].to_numpy()
+        self.fields = {
+            field: pd.to_numeric(frame[field]).to_numpy() for field in PRODUCT_FIELDS
+        }
+        counts = np.bincount(np.sort(order.codes), minlength=len(self.categories))
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        self._slices = {
+            category: slice(int(bounds[i]), int(bounds[i + 1]))
+            for i, category in enumerate(self.categories)
+        }
+        self._rows = {
+            category: {
+                product: self._slices[category].start + j
+                for j, product in enumerate(self.products[self._slices[category]])
+            }
+            for category in self.categories
+        }
+        self._views = {}
+
+    def __len__(self):
+        return len(self.products)
+
+    def __contains__(self, category):
+        return category in self._slices
+
+    def category_products(self, category):
+        """Product names of ``category``, in catalog order."""
+        return self.products[self._slices[category]]
+
+    def product(self, category, product):
+        """Fields of one product as a dict."""
+        row = self._rows[category][product]
+        return {field: values[row].item() for field, values in self.fields.items()}
+
+    def category(self, category):
+        """``{product: {field: value}}`` for ``category``, a fresh copy."""
+        rows = self._slices[category]
+        columns = {
+            field: values[rows].tolist() for field, values in self.fields.items()
+        }
+        return {
+            product: {field: columns[field][j] for field in PRODUCT_FIELDS}
+            for j, product in enumerate(self.products[rows].tolist())
+        }
+
+    def view(self, category):
+        """Cached ``{product: {field: value}}`` of ``category``; do not mutate."""
+        if category not in self._views:
+            self._views[category] = self.category(category)
+        return self._views[category]
+
+
+def load(path=None):
+    """Read the catalog from ``path``, ``$RETAIL_CATALOG`` or the bundled CSV."""
+    path = path or os.environ.get(ENV_PATH) or DEFAULT_PATH
+    if path.lower().endswith((".parquet", ".pq")):
+        frame = pd.read_parquet(path)
+    else:
+        frame = pd.read_csv(path)
+    return Catalog(frame)
+
+
+@functools.lru_cache(maxsize=None)
+def _shared(path):
+    return load(path)
+
+
+def shared(path=None):
+    """Process-wide catalog for ``path``, loaded on first use."""
+    return _shared(path or os.environ.get(ENV_PATH) or DEFAULT_PATH)
+
+
+def _base(record, product_catalog):
+    if "category" not in record:
+        return {}
+    return (product_catalog or shared()).view(record["category"])
+
+
+def product_names(record, product_catalog=None):
+    """Effective product names of a location record, in display order."""
+    if "product" in record:
+        return list(record["product"])
+    removed = set(record.get("removed", ()))
+    base = _base(record, product_catalog)
+    names = [product for product in base if product not in removed]
+    names += [product for product in record.get("overrides", {}) if product not in base]
+    return names
+
+
+def effective_products(record, product_catalog=None):
+    """``{product: {field: value}}`` of a location record, built on demand."""
+    if "product" in record:
+        return record["product"]
+    base = _base(record, product_catalog)
+    overrides = record.get("overrides", {})
+    return {
+        product: {**base.get(product, {}), **overrides.get(product, {})}
+        for product in product_names(record, product_catalog)
+    }
+
+
+def diff_products(base, edited):
+    """``(overrides, removed)`` that turn ``base`` into ``edited``."""
+    overrides = {}
+    for product, fields in edited.items():
+        if product is None or product != product:
+            continue
+        original = base.get(product)
+        if original is None:
+            overrides[product] = dict(fields)
+            continue
+        changed = {
+            field: value
+            for field, value in fields.items()
+            if field not in original or value != original[field]
+        }
+        if changed:
+            overrides[product] = changed
+    removed = [product for product in base if product not in edited]
+    return overrides, removed
@@ -0,0 +1,84 @@
+"""Plot helpers that keep long simulations cheap to send to the browser.
+
+Series are downsampled server-side with Largest-Triangle-Three-Buckets
+(LTTB), which keeps the peaks and troughs a plain stride would drop, and can
+be drawn with WebGL traces instead of SVG.
+
+``plotly.express`` is only imported by the first figure, keeping it off
+the page's cold start.
+"""
+
+import numpy as np
+
+
+def lttb(x, y, threshold):
+    """Indices of at most ``threshold`` points of ``(x, y)`` chosen by LTTB.
+
+    ``x`` must be sorted. The first and last points are always kept.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = x.size
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_start, next_stop = stop, edges[i + 2] if i + 2 < edges.size else n
+        next_x = x[next_start:next_stop].mean()
+        next_y = y[next_start:next_stop].mean()
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def downsample(frame, x, y, by=None, max_points=None):
+    """Downsample every series of a long ``frame`` to share ``max_points``.
+
+    ``by`` lists the columns identifying a series. Returns ``frame``
+    unchanged when it already fits.
+    """
+    if not max_points or len(frame) <= max_points:
+        return frame
+    if not by:
+        frame = frame.sort_values(x, kind="stable")
+        return frame.iloc[lttb(frame[x], frame[y], max_points)]
+
+    groups = frame.groupby(by, observed=True, sort=False).indices
+    budget = max(max_points // max(len(groups), 1), 3)
+    keep = []
+    for rows in groups.values():
+        rows = rows[np.argsort(frame[x].to_numpy()[rows], kind="stable")]
+        keep.append(
+            rows[lttb(frame[x].to_numpy()[rows], frame[y].to_numpy()[rows], budget)]
+        )
+    return frame.iloc[np.concatenate(keep)]
+
+
+def line_figure(frame, x, y, color=None, line_dash=None, max_points=None, webgl=False):
+    """``px.line`` of a long frame, downsampled and optionally WebGL-rendered.
+
+    Markers are only drawn while the plotted frame has at most 500 points.
+    """
+    import plotly.express as px
+
+    by = [column for column in (color, line_dash) if column is not None]
+    frame = downsample(frame, x, y, by=by, max_points=max_points)
+    return px.line(
+        data_frame=frame,
+        x=x,
+        y=y,
+        color=color,
+        line_dash=line_dash,
+        markers=len(frame) <= 500,
+        render_mode="webgl" if webgl else "svg",
+    )
@@ -0,0 +1,126 @@
+"""Cross-location metrics for the all-locations dashboard.
+
+:func:`location_metrics` computes capacity utilisation, margin, sales
+velocity and marketing lift for many locations in one batched pass.
+:class:`DashboardCache` keeps the rows per location and only recomputes the
+locations whose ``version`` changed since the last call.
+"""
+
+import numpy as np
+import pandas as pd
+
+from retail import engine, timeseries
+
+COLUMNS = [
+    "products",
+    "rental_size",
+    "planned_volume",
+    "utilisation_pct",
+    "planned_margin",
+    "unit_margin_pct",
+    "velocity",
+    "lift_pct",
+]
+
+
+def _quantity_matrix(store_location, locations, products, key):
+    index = {product: j for j, product in enumerate(products)}
+    matrix = np.zeros((len(locations), len(products)))
+    for i, location in enumerate(locations):
+        for product, quantity in store_location[location].get(key, {}).items():
+            if product in index:
+                matrix[i, index[product]] = quantity or 0
+    return matrix
+
+
+def location_metrics(store_location, locations=None):
+    """One row per location with the dashboard metrics.
+
+    Utilisation and planned margin use each location's ``planned_stock``;
+    velocity is total units sold per day over all products; lift is the
+    change of total units sold after marketing, in percent.
+    """
+    if locations is None:
+        locations = list(store_location)
+    locations = list(locations)
+    if not locations:
+        return pd.DataFrame(columns=COLUMNS)
+
+    arrays = engine.build_location_arrays(store_location, locations)
+    planned = _quantity_matrix(
+        store_location, locations, arrays.products, "planned_stock"
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        unit_margin_pct = np.where(
+            arrays.mask & (arrays.price > 0), arrays.margin / arrays.price * 100, np.nan
+        )
+    metrics = pd.DataFrame(
+        {
+            "products": arrays.mask.sum(axis=1),
+            "rental_size": arrays.rental_size,
+            "planned_volume": engine.stock_volume(arrays.dimension, planned),
+            "utilisation_pct": engine.stock_percentage(
+                arrays.dimension, planned, arrays.rental_size
+            ),
+            "planned_margin": (arrays.margin * planned).sum(axis=1),
+            "unit_margin_pct": (
+                np.nanmean(np.where(arrays.mask, unit_margin_pct, np.nan), axis=1)
+                if arrays.products
+                else np.nan
+            ),
+        },
+        index=pd.Index(locations, name="location"),
+    )
+
+    long = timeseries.TimeSeriesStore.from_locations(
+        {location: store_location[location] for location in locations}
+    ).frame
+    sales = long[long["metric"] == "UnitSold"]
+    by_location = sales.groupby("location", observed=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        velocity = by_location["value"].sum() / by_location["day"].max()
+    metrics["velocity"] = velocity.reindex(metrics.index)
+
+    # Lift of the summed per-day means: windows may differ in length.
+    marketing = (
+        long[long["metric"].isin(["UnitSold-Before", "UnitSold-After"])]
+        .groupby(["location", "product", "metric"], observed=True)["value"]
+        .mean()
+        .groupby(level=["location", "metric"], observed=True)
+        .sum()
+        .unstack("metric")
+        .reindex(columns=["UnitSold-Before", "UnitSold-After"], fill_value=0.0)
+    )
+    before = marketing["UnitSold-Before"]
+    lift = (marketing["UnitSold-After"] - before) / before.where(before != 0) * 100
+    metrics["lift_pct"] = lift.reindex(metrics.index)
+    return metrics[COLUMNS]
+
+
+class DashboardCache:
+    """Per-location metric rows, recomputed only for changed locations."""
+
+    def __init__(self):
+        self.rows = {}
+        self.recomputed = 0
+
+    def frame(self, store_location):
+        stale = [
+            location
+            for location, record in store_location.items()
+            if location not in self.rows
+            or self.rows[location][0] != record.get("version")
+        ]
+        if stale:
+            fresh = location_metrics(store_location, stale)
+            for location, row in fresh.iterrows():
+                self.rows[location] = (store_location[location].get("version"), row)
+        self.recomputed = len(stale)
+        for location in set(self.rows) - set(store_location):
+            del self.rows[location]
+        if not store_location:
+            return pd.DataFrame(columns=COLUMNS)
+        return pd.DataFrame(
+            [self.rows[location][1] for location in store_location],
+            index=pd.Index(list(store_location), name="location"),
+        )
@@ -0,0 +1,175 @@
+"""Vectorized retail analytics.
+
+Locations and products are held as NumPy arrays so that every calculation
+the Retail Module page needs (stock percentage, margins, sales velocity)
+runs as a batched array operation instead of a Python loop over the
+session-state dicts. COGS de-accumulation and before/after comparisons
+live in :mod:`retail.timeseries`.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from retail.catalog import PRODUCT_FIELDS, effective_products
+
+# Horizons, in days, of the Sales Velocity projections.
+PROJECTION_DAYS = (3, 5, 7, 14, 30)
+
+
+@dataclass
+class LocationArrays:
+    """Locations x products view of the store configuration.
+
+    Every product attribute is an ``(L, P)`` float array on a shared product
+    axis; ``mask`` marks which products a location actually carries.
+    """
+
+    locations: list
+    products: list
+    costs: np.ndarray
+    price: np.ndarray
+    shelf_life: np.ndarray
+    dimension: np.ndarray
+    mask: np.ndarray
+    rental_size: np.ndarray
+    rental_cost: np.ndarray
+
+    @property
+    def margin(self):
+        return np.where(self.mask, self.price - self.costs, 0.0)
+
+    def location(self, name):
+        """Return the ``(P,)`` row arrays of a single location."""
+        i = self.locations.index(name)
+        return LocationArrays(
+            locations=[name],
+            products=self.products,
+            costs=self.costs[i],
+            price=self.price[i],
+            shelf_life=self.shelf_life[i],
+            dimension=self.dimension[i],
+            mask=self.mask[i],
+            rental_size=self.rental_size[i],
+            rental_cost=self.rental_cost[i],
+        )
+
+
+def _numeric(values):
+    return np.nan_to_num(
+        pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(
+            dtype=float
+        )
+    )
+
+
+def build_location_arrays(store_location, locations=None):
+    """Build a :class:`LocationArrays` from ``st.session_state.store_location``.
+
+    Products are the locations' effective products (see
+    :func:`retail.catalog.effective_products`), unioned in first-seen order.
+    Missing or non-numeric attributes become ``0``.
+    """
+    if locations is None:
+        locations = list(store_location.keys())
+
+    location_products = [
+        effective_products(store_location[location]) for location in locations
+    ]
+    products = []
+    seen = set()
+    for product_dict in location_products:
+        for product in product_dict:
+            if product not in seen:
+                seen.add(product)
+                products.append(product)
+
+    index = {product: j for j, product in enumerate(products)}
+    shape = (len(locations), len(products))
+    rows, cols, values = [], [], {field: [] for field in PRODUCT_FIELDS}
+    for i, product_dict in enumerate(location_products):
+        for product, attributes in product_dict.items():
+            rows.append(i)
+            cols.append(index[product])
+            for field in PRODUCT_FIELDS:
+                values[field].append((attributes or {}).get(field))
+
+    fields = {}
+    for field in PRODUCT_FIELDS:
+        array = np.zeros(shape)
+        array[rows, cols] = _numeric(values[field])
+        fields[field] = array
+    mask = np.zeros(shape, dtype=bool)
+    mask[rows, cols] = True
+
+    return LocationArrays(
+        locations=list(locations),
+        products=products,
+        costs=fields["Costs"],
+        price=fields["Initial_Price"],
+        shelf_life=fields["Shelf_Life"],
+        dimension=fields["Product_Dimension"],
+        mask=mask,
+        rental_size=_numeric(
+            [store_location[loc].get("rental_size", 0.0) for loc in locations]
+        ),
+        rental_cost=_numeric(
+            [store_location[loc].get("rental_cost", 0.0) for loc in locations]
+        ),
+    )
+
+
+def product_arrays(product_dict, products=None):
+    """Single-location shortcut returning ``(P,)`` arrays for ``product_dict``."""
+    if products is None:
+        products = list(product_dict.keys())
+    arrays = build_location_arrays(
+        {None: {"product": {product: product_dict[product] for product in products}}}
+    )
+    return arrays.location(None)
+
+
+def stock_volume(dimension, quantities):
+    """Total occupied volume along the last (product) axis."""
+    return np.sum(np.asarray(dimension, dtype=float) * quantities, axis=-1)
+
+
+def stock_percentage(dimension, quantities, rental_size):
+    """Occupied share of ``rental_size`` in percent.
+
+    Broadcasts over any leading axes, e.g. ``(L, P)`` quantities with ``(L,)``
+    rental sizes. Locations without a positive rental size yield ``nan``.
+    """
+    volume = stock_volume(dimension, quantities)
+    rental_size = np.asarray(rental_size, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(rental_size > 0, volume / rental_size * 100, np.nan)
+
+
+def sales_velocity(units, days):
+    """Average units sold per day for each product column of ``units``.
+
+    ``units`` is ``(D, P)`` (or ``(..., D, P)``) and ``days`` the matching day
+    numbers; the total is divided by the last recorded day. Returns ``nan``
+    when there is no history.
+    """
+    units = np.nan_to_num(np.asarray(units, dtype=float))
+    days = np.asarray(days, dtype=float)
+    if days.size == 0:
+        return np.full(units.shape[:-2] + units.shape[-1:], np.nan)
+    last_day = np.nanmax(days, axis=-1)
+    total = units.sum(axis=-2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            np.asarray(last_day)[..., None] > 0,
+            total / np.asarray(last_day)[..., None],
+            np.nan,
+        )
+
+
+def project_sales(velocity, horizons):
+    """Projected units for every product and horizon, shape ``(..., P, H)``."""
+    return np.asarray(velocity, dtype=float)[..., None] * np.asarray(
+        horizons, dtype=float
+    )
@@ -0,0 +1,214 @@
+"""Sales-velocity forecasts from the Sales Velocity table.
+
+Rows are read as a daily series (days without a row sold nothing, as in
+the ``total / last day`` average; rows without a positive day are left
+out) and, for every product at once, the forecast keeps::
+
+    average   total units / last day
+    rolling   mean daily units of the last ``window`` days
+    ewma      exponentially weighted daily units, ``halflife`` in days
+    trend     least-squares slope of the last ``window`` days
+
+Projections add the trend to the EWMA level day by day, floored at zero,
+for all products and horizons in one array operation.
+
+A :class:`VelocityState` holds running totals, the EWMA level and the last
+``window`` days only; gaps between rows are folded in closed form, so no
+array spans the whole day range. :func:`advance` folds rows appended after the last
+seen day into it without re-reading the history; any other edit of the
+table, or new parameters, rebuild it.
+"""
+
+import hashlib
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class VelocityState:
+    """Running state of the velocity forecast of one table."""
+
+    window: int
+    halflife: float
+    rows: int
+    digest: str
+    last_day: int
+    total: np.ndarray
+    level: np.ndarray
+    recent: np.ndarray
+
+
+@dataclass
+class VelocityForecast:
+    """Velocities and trend-adjusted projections, one row per product."""
+
+    products: list
+    average: np.ndarray
+    rolling: np.ndarray
+    ewma: np.ndarray
+    trend: np.ndarray
+    horizons: list
+    projected: np.ndarray
+    window: int
+
+    def to_frame(self):
+        frame = pd.DataFrame(
+            {
+                "Avg Sales/Day": self.average,
+                f"Last {self.window}d/Day": self.rolling,
+                "EWMA/Day": self.ewma,
+                "Trend (/Day)": self.trend,
+            },
+            index=pd.Index(self.products, name="Product"),
+        )
+        for j, days in enumerate(self.horizons):
+            frame[f"Projected {days}d"] = self.projected[:, j]
+        return frame
+
+
+def _empty(num_products, window, halflife):
+    return VelocityState(
+        window=window,
+        halflife=halflife,
+        rows=0,
+        digest="",
+        last_day=0,
+        total=np.zeros(num_products),
+        level=np.full(num_products, np.nan),
+        recent=np.zeros((0, num_products)),
+    )
+
+
+def _day_totals(units, days):
+    """Units summed per day, for strictly increasing days."""
+    if len(days) and not (np.diff(days) > 0).all():
+        # Sum the rows of repeated days.
+        order = np.argsort(days, kind="stable")
+        days, starts = np.unique(days[order], return_index=True)
+        units = np.add.reduceat(units[order], starts, dtype=float)
+    return units, days
+
+
+def _fold(state, units, days, digest):
+    rows = state.rows + len(units)
+    # Rows up to the last seen day (including blank days, read as day 0) are
+    # out of range; drop them once so totals and daily values agree.
+    keep = days > state.last_day
+    units, days = _day_totals(units[keep], days[keep])
+    last_day = int(days[-1]) if len(days) else state.last_day
+
+    # Dense daily units of the last ``window`` days only.
+    first = max(last_day - state.window, state.last_day)
+    recent = np.zeros((last_day - first, units.shape[1]))
+    in_window = days > first
+    recent[days[in_window] - first - 1] = units[in_window]
+
+    # Closed form of ``level = decay * level + (1 - decay) * x`` over the new
+    # days; days without a row only decay the level.
+    decay = 0.5 ** (1 / state.halflife)
+    level = state.level
+    steps = last_day - state.last_day
+    updates = units, days
+    if state.last_day == 0 and len(days):
+        level = units[0] if days[0] == 1 else np.zeros(units.shape[1])
+        steps -= 1
+        if days[0] == 1:
+            updates = units[1:], days[1:]
+    if steps:
+        weights = (1 - decay) * decay ** (last_day - updates[1]).astype(float)
+        level = decay**steps * level + weights @ updates[0]
+    return VelocityState(
+        window=state.window,
+        halflife=state.halflife,
+        rows=rows,
+        digest=digest,
+        last_day=last_day,
+        total=state.total + units.sum(axis=0, dtype=float),
+        level=level,
+        recent=np.concatenate([state.recent, recent])[-state.window :],
+    )
+
+
+def _digests(units, days, rows):
+    """Hashes of the first ``rows`` rows and of all rows, in one pass."""
+    hashers = [hashlib.sha256(f"{units.dtype}{units.shape[1:]}".encode())]
+    hashers.append(hashlib.sha256())
+    for hasher, array in zip(hashers, (units, days)):
+        hasher.update(array[:rows].reshape(-1).view(np.uint8))
+    prefix = "".join(hasher.hexdigest() for hasher in hashers)
+    for hasher, array in zip(hashers, (units, days)):
+        hasher.update(array[rows:].reshape(-1).view(np.uint8))
+    return prefix, "".join(hasher.hexdigest() for hasher in hashers)
+
+
+def advance(state, units, days, window=7, halflife=7.0):
+    """``state`` updated to the ``(D, P)`` ``units`` and ``days`` of a table.
+
+    Only the rows after ``state.rows`` are read when the earlier rows are
+    unchanged and the new rows all come after the last seen day; otherwise
+    the state is rebuilt from the whole table. ``state`` may be ``None``.
+    """
+    units = np.ascontiguousarray(units)
+    if units.dtype.kind != "f":
+        units = units.astype(float)
+    if np.isnan(units).any():
+        units = np.nan_to_num(units)
+    days = np.ascontiguousarray(days, dtype=np.int64)
+    window = int(window)
+    halflife = float(halflife)
+    if window < 1 or halflife <= 0:
+        raise ValueError("window and halflife must be positive")
+
+    rows = state.rows if state is not None and state.rows <= len(units) else 0
+    prefix, digest = _digests(units, days, rows)
+    if not (
+        state is not None
+        and (state.window, state.halflife) == (window, halflife)
+        and state.total.shape == units.shape[1:]
+        and rows == state.rows
+        and prefix == state.digest
+        and (days[rows:] > state.last_day).all()
+    ):
+        state = _empty(units.shape[1], window, halflife)
+        rows = 0
+    if rows and rows == len(units):
+        return state
+    return _fold(state, units[rows:], days[rows:], digest)
+
+
+def _trend(recent):
+    steps = len(recent)
+    if steps < 2:
+        return np.zeros(recent.shape[1])
+    t = np.arange(steps) - (steps - 1) / 2
+    return t @ (recent - recent.mean(axis=0)) / (t @ t)
+
+
+def forecast(state, products, horizons):
+    """Velocities of ``state`` and projected units for every horizon."""
+    horizons = [int(days) for days in horizons]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        average = np.where(
+            state.last_day > 0, state.total / max(state.last_day, 1), np.nan
+        )
+    if len(state.recent):
+        rolling = state.recent.mean(axis=0)
+    else:
+        rolling = np.full(state.total.shape, np.nan)
+    trend = _trend(state.recent)
+
+    steps = np.arange(1, max(horizons, default=0) + 1)
+    daily = np.clip(state.level[:, None] + trend[:, None] * steps, 0, None)
+    projected = np.cumsum(daily, axis=1)[:, np.asarray(horizons, dtype=int) - 1]
+    return VelocityForecast(
+        products=list(products),
+        average=average,
+        rolling=rolling,
+        ewma=state.level,
+        trend=trend,
+        horizons=horizons,
+        projected=projected,
+        window=state.window,
+    )
@@ -0,0 +1,200 @@
+"""Bulk import of exported simulation logs into the editor tables.
+
+Files are read in chunks with typed columns, so long games with thousands of
+day-rows per location never have to be typed into ``st.data_editor`` or
+parsed in one piece. A ``Location`` column splits one file over many
+locations; without it every row belongs to ``default_location``.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from retail import schema
+from retail.schema import DAY_COLUMN
+from retail.timeseries import (
+    ACCUMULATED_METRICS,
+    CURRENCY_METRICS,
+    TABLE_METRICS,
+    column_name,
+)
+
+TABLE_KINDS = tuple(TABLE_METRICS)
+LOCATION_COLUMN = "Location"
+
+# Tables whose blank cells are days without an observation, kept as NaN
+# rather than read as zero sales: the marketing windows may differ in length.
+SPARSE_KINDS = ("marketing",)
+
+
+def table_columns(kind, products):
+    """Editor columns of ``kind`` for ``products``, ``Day`` first."""
+    if kind not in TABLE_METRICS:
+        raise ValueError(f"kind must be one of {TABLE_KINDS}")
+    return [DAY_COLUMN] + [
+        column_name(product, metric)
+        for metric in TABLE_METRICS[kind]
+        for product in products
+    ]
+
+
+def currency_columns(kind, products):
+    """Columns of ``kind`` that hold currency values (kept ``float64``)."""
+    if kind not in TABLE_METRICS:
+        raise ValueError(f"kind must be one of {TABLE_KINDS}")
+    return [
+        column_name(product, metric)
+        for metric in TABLE_METRICS[kind]
+        if metric in CURRENCY_METRICS
+        for product in products
+    ]
+
+
+def accumulated_columns(kind, products):
+    """Columns of ``kind`` that hold running totals."""
+    return [
+        column_name(product, metric)
+        for metric in TABLE_METRICS[kind]
+        if metric in ACCUMULATED_METRICS
+        for product in products
+    ]
+
+
+def blank_value(kind):
+    """Value of blank cells in ``kind`` tables: NaN for sparse kinds, else 0."""
+    return np.nan if kind in SPARSE_KINDS else 0.0
+
+
+def empty_table(kind, products, num_rows=0):
+    """Blank editor table with days ``1..num_rows``."""
+    return schema.empty_day_table(
+        table_columns(kind, products),
+        num_rows,
+        currency_columns(kind, products),
+        blank_value(kind),
+    )
+
+
+def typed_table(frame, kind, products):
+    """``frame`` as a typed ``kind`` table, sorted by day.
+
+    Blank accumulated cells carry the previous day's total forward (zero
+    before the first), so de-accumulating them gives no spurious spike.
+    """
+    accumulated = accumulated_columns(kind, products)
+    typed = _typed(
+        frame,
+        table_columns(kind, products),
+        currency_columns(kind, products),
+        blank_value(kind),
+        accumulated,
+    ).drop(columns=LOCATION_COLUMN)
+    return _carried(typed, accumulated)
+
+
+def _typed(chunk, columns, currency, blank, accumulated):
+    typed = schema.day_table(chunk, columns, currency, blank)
+    if accumulated:
+        typed[accumulated] = schema.matrix(
+            chunk, accumulated, schema.CURRENCY_DTYPE, blank=np.nan
+        )
+    location = chunk.get(LOCATION_COLUMN, pd.Series(index=chunk.index, dtype=object))
+    typed.insert(0, LOCATION_COLUMN, location.to_numpy())
+    return typed
+
+
+def _carried(table, accumulated):
+    table = table.sort_values(DAY_COLUMN, kind="stable").reset_index(drop=True)
+    if accumulated:
+        table[accumulated] = table[accumulated].ffill().fillna(0.0)
+    return table
+
+
+def _csv_chunks(source, wanted, chunksize):
+    return pd.read_csv(
+        source,
+        chunksize=chunksize,
+        usecols=lambda column: column in wanted,
+        dtype={LOCATION_COLUMN: str},
+    )
+
+
+def _parquet_chunks(source, wanted, chunksize):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError("Reading Parquet files requires pyarrow") from error
+
+    parquet = pq.ParquetFile(source)
+    present = [name for name in parquet.schema_arrow.names if name in wanted]
+    for batch in parquet.iter_batches(batch_size=chunksize, columns=present):
+        yield batch.to_pandas()
+
+
+def _size(source):
+    """Bytes in ``source`` (a path or a seekable file), or ``None``."""
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    try:
+        position = source.tell()
+        size = source.seek(0, os.SEEK_END)
+        source.seek(position)
+    except (AttributeError, OSError):
+        return None
+    return size
+
+
+def read_table(
+    source,
+    kind,
+    products,
+    file_format="csv",
+    default_location=None,
+    chunksize=50_000,
+    progress=None,
+):
+    """Read an exported log into ``{location: table}``.
+
+    Only the ``kind`` columns for ``products`` are kept; missing columns are
+    blank (see :func:`blank_value`); blank accumulated cells carry the
+    previous day's total forward. Tables follow :mod:`retail.schema` and
+    are sorted by day.
+
+    ``progress(fraction, message)`` is called after every chunk; the
+    fraction is only known for file objects, otherwise it stays 0. An
+    exception raised from it stops the import.
+    """
+    columns = table_columns(kind, products)
+    currency = currency_columns(kind, products)
+    accumulated = accumulated_columns(kind, products)
+    wanted = set(columns) | {LOCATION_COLUMN}
+    if file_format == "csv":
+        chunks = _csv_chunks(source, wanted, chunksize)
+    elif file_format == "parquet":
+        chunks = _parquet_chunks(source, wanted, chunksize)
+    else:
+        raise ValueError("file_format must be 'csv' or 'parquet'")
+
+    size = _size(source)
+    rows = 0
+    parts = {}
+    for chunk in chunks:
+        typed = _typed(chunk, columns, currency, blank_value(kind), accumulated)
+        typed[LOCATION_COLUMN] = typed[LOCATION_COLUMN].fillna(default_location)
+        for location, part in typed.groupby(LOCATION_COLUMN, sort=False, dropna=False):
+            parts.setdefault(location, []).append(part.drop(columns=LOCATION_COLUMN))
+        rows += len(chunk)
+        if progress is not None:
+            fraction = source.tell() / size if size and hasattr(source, "tell") else 0
+            progress(min(fraction, 1.0), f"{rows:,} rows read")
+
+    return {
+        location: _carried(pd.concat(frames, ignore_index=True), accumulated)
+        for location, frames in parts.items()
+    }
+
+
+def file_format(name):
+    """``"parquet"`` for ``.parquet``/``.pq`` file names, else ``"csv"``."""
+    return "parquet" if name.lower().endswith((".parquet", ".pq")) else "csv"
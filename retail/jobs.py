@@ -0,0 +1,203 @@
+"""Background jobs for long-running analyses.
+
+A :class:`JobRunner` runs functions on a shared thread pool so a heavy
+calculation does not hold the page's script thread, and a bounded pool keeps
+one user's jobs from starving everyone else on the server. Jobs are keyed by
+a hash of their inputs (:func:`input_key`): submitting the same inputs again
+returns the running or finished job, and submitting new inputs for the same
+``group`` cancels the job that is now stale. Job functions receive a
+``progress(fraction, message=None)`` callback, which raises
+:class:`Cancelled` once the job has been cancelled.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class Cancelled(Exception):
+    """Raised inside a job whose cancellation was requested."""
+
+
+def input_key(*parts):
+    """Stable hash of ``parts`` (arrays, frames, bytes, scalars, containers)."""
+    digest = hashlib.sha256()
+
+    def update(part):
+        if isinstance(part, np.ndarray):
+            array = np.ascontiguousarray(part)
+            digest.update(f"{array.dtype}{array.shape}".encode())
+            if array.dtype.hasobject:
+                update(array.tolist())
+            else:
+                digest.update(array.reshape(-1).view(np.uint8))
+        elif isinstance(part, (bytes, bytearray, memoryview)):
+            digest.update(f"bytes{len(part)}".encode())
+            digest.update(part)
+        elif hasattr(part, "codes") and hasattr(part, "categories"):
+            # Categoricals hash by codes and categories, not element by element.
+            update(np.asarray(part.codes))
+            update(np.asarray(part.categories))
+        elif hasattr(part, "to_numpy") and hasattr(part, "columns"):
+            update(list(part.columns))
+            if all(dtype.kind in "biuf" for dtype in part.dtypes):
+                update(part.to_numpy())
+            else:
+                for j in range(part.shape[1]):
+                    update(part.iloc[:, j].array)
+        elif hasattr(part, "to_numpy"):
+            update(part.to_numpy())
+        elif isinstance(part, dict):
+            for key in sorted(part, key=repr):
+                update(key)
+                update(part[key])
+        elif isinstance(part, (list, tuple)):
+            digest.update(f"{type(part).__name__}{len(part)}".encode())
+            for item in part:
+                update(item)
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b"|")
+
+    for part in parts:
+        update(part)
+    return digest.hexdigest()
+
+
+class Job:
+    """One submitted job; poll :attr:`status` and :attr:`progress`."""
+
+    def __init__(self, key, group=None):
+        self.key = key
+        self.group = group
+        self.progress = 0.0
+        self.message = ""
+        self.created = time.time()
+        self.future = None
+        self._cancel = threading.Event()
+
+    def report(self, fraction, message=None):
+        """Progress callback handed to the job function."""
+        if self._cancel.is_set():
+            raise Cancelled(self.key)
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def status(self):
+        """``queued``, ``running``, ``done``, ``failed`` or ``cancelled``."""
+        future = self.future
+        if future is None or not future.done():
+            if self.cancelled:
+                return "cancelled"
+            return "running" if future is not None and future.running() else "queued"
+        if future.cancelled():
+            return "cancelled"
+        error = future.exception()
+        if isinstance(error, Cancelled):
+            return "cancelled"
+        return "failed" if error is not None else "done"
+
+    @property
+    def done(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    @property
+    def error(self):
+        if self.status != "failed":
+            return None
+        return self.future.exception()
+
+    def result(self):
+        return self.future.result()
+
+
+class JobRunner:
+    """Thread pool running :class:`Job` objects keyed by their inputs."""
+
+    def __init__(self, max_workers=None, keep=64):
+        if max_workers is None:
+            max_workers = min(4, os.cpu_count() or 1)
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="retail-job"
+        )
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.keep = keep
+
+    @staticmethod
+    def _run(job, function, args, kwargs):
+        if job.cancelled:
+            raise Cancelled(job.key)
+        result = function(*args, progress=job.report, **kwargs)
+        job.progress = 1.0
+        return result
+
+    def submit(self, key, function, *args, group=None, **kwargs):
+        """Run ``function(*args, progress=..., **kwargs)`` unless ``key`` exists.
+
+        A queued, running or finished job with the same key is returned as
+        is; failed and cancelled jobs are resubmitted. Other jobs of
+        ``group`` are cancelled.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.status not in ("failed", "cancelled"):
+                self._jobs.move_to_end(key)
+                return job
+            if group is not None:
+                self._cancel_group(group, keep=key)
+            job = Job(key, group)
+            job.future = self._pool.submit(self._run, job, function, args, kwargs)
+            self._jobs[key] = job
+            self._prune()
+            return job
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    def cancel(self, key):
+        job = self.get(key)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def _cancel_group(self, group, keep=None):
+        for key, job in self._jobs.items():
+            if job.group == group and key != keep and not job.done:
+                job.cancel()
+
+    def cancel_group(self, group, keep=None):
+        """Cancel every unfinished job of ``group`` except ``keep``."""
+        with self._lock:
+            self._cancel_group(group, keep)
+
+    def _prune(self):
+        finished = [key for key, job in self._jobs.items() if job.done]
+        for key in finished[: max(len(finished) - self.keep, 0)]:
+            del self._jobs[key]
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def shutdown(self):
+        for job in self.jobs():
+            job.cancel()
+        self._pool.shutdown(wait=False)
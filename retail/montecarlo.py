@@ -0,0 +1,130 @@
+"""Monte Carlo demand simulation for a proposed restock plan.
+
+Daily demand paths are bootstrapped from recorded sales rows, so the
+correlation between products on the same day is kept. Each batch of paths
+is run through :func:`retail.simulation.simulate_inventory` with the path
+axis standing in for locations. Batches are seeded from one
+``numpy.random.SeedSequence`` and may be spread over worker processes;
+the result only depends on ``seed`` and ``batch_size``, not on how many
+workers ran it.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from retail.simulation import simulate_inventory
+
+
+@dataclass
+class MonteCarloResult:
+    """Probabilities and expected values over all simulated paths."""
+
+    paths: int
+    stockout_probability: np.ndarray
+    waste_probability: np.ndarray
+    overflow_probability: float
+    expected_lost_sales: np.ndarray
+    expected_waste: np.ndarray
+    expected_overflow_cost: float
+
+
+def _run_batch(history, paths, seed, simulation_kwargs):
+    rng = np.random.default_rng(seed)
+    horizon = simulation_kwargs["restock"].shape[0]
+    rows = rng.integers(0, history.shape[0], size=(horizon, paths))
+    result = simulate_inventory(demand=history[rows], **simulation_kwargs)
+    overflow = result.overflow_cost.sum(axis=-1)
+    return {
+        "stockout": (result.lost_sales > 0).sum(axis=0),
+        "waste": (result.waste > 0).sum(axis=0),
+        "overflow": int((overflow > 0).sum()),
+        "lost_sales": result.lost_sales.sum(axis=0),
+        "waste_units": result.waste.sum(axis=0),
+        "overflow_cost": float(overflow.sum()),
+    }
+
+
+def run_monte_carlo(
+    history,
+    dimension,
+    shelf_life,
+    rental_size,
+    restock,
+    overflow_fee=0.0,
+    initial_stock=0.0,
+    paths=100_000,
+    batch_size=5_000,
+    workers=1,
+    seed=0,
+    progress=None,
+):
+    """Estimate stockout, waste and overflow risk of a restock plan.
+
+    ``history`` holds recorded daily units sold, ``(H, P)``. ``restock`` is a
+    ``(D, P)`` daily schedule whose length sets the simulated horizon.
+    ``workers=None`` uses every CPU; ``workers=1`` runs in-process.
+    ``progress(fraction, message)`` is called after every batch; an
+    exception raised from it stops the run and cancels pending batches.
+    """
+    history = np.nan_to_num(np.asarray(history, dtype=float))
+    if history.ndim != 2 or history.shape[0] == 0:
+        raise ValueError("history needs at least one day of sales")
+    restock = np.asarray(restock, dtype=float)
+    simulation_kwargs = {
+        "dimension": np.asarray(dimension, dtype=float),
+        "shelf_life": np.asarray(shelf_life, dtype=float),
+        "rental_size": float(rental_size),
+        "overflow_fee": float(overflow_fee),
+        "initial_stock": np.asarray(initial_stock, dtype=float),
+        "restock": restock[:, None, :],
+    }
+
+    sizes = [batch_size] * (paths // batch_size)
+    if paths % batch_size:
+        sizes.append(paths % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [
+        (history, size, child, simulation_kwargs) for size, child in zip(sizes, seeds)
+    ]
+
+    def report(batches):
+        if progress is not None:
+            done = sum(sizes[: len(batches)])
+            progress(done / paths, f"{done:,} of {paths:,} paths")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    batches = []
+    if workers > 1 and len(jobs) > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=min(workers, len(jobs)),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        try:
+            futures = [pool.submit(_run_batch, *job) for job in jobs]
+            for future in futures:
+                batches.append(future.result())
+                report(batches)
+        finally:
+            pool.shutdown(cancel_futures=True)
+    else:
+        for job in jobs:
+            batches.append(_run_batch(*job))
+            report(batches)
+
+    def total(key):
+        return sum(batch[key] for batch in batches)
+
+    return MonteCarloResult(
+        paths=paths,
+        stockout_probability=total("stockout") / paths,
+        waste_probability=total("waste") / paths,
+        overflow_probability=total("overflow") / paths,
+        expected_lost_sales=total("lost_sales") / paths,
+        expected_waste=total("waste_units") / paths,
+        expected_overflow_cost=total("overflow_cost") / paths,
+    )
@@ -0,0 +1,342 @@
+"""SQLite-backed location store.
+
+Location records, their product overrides and their editor tables are kept
+in one SQLite file so they survive page reloads and container restarts::
+
+    locations     name, position, data (JSON of the scalar fields)
+    overrides     location, product, fields (JSON), removed
+    tables        location, kind, columns (JSON names and dtypes), digest
+    table_rows    location, kind, row, day, data (packed row values)
+
+A table row is one SQLite row: its ``float32`` values followed by its
+``float64`` values, packed little-endian into one blob, indexed by location
+and day. Saving a table whose content hash is unchanged writes nothing;
+otherwise only the rows whose day or values changed are written. Records
+are loaded without their tables; :class:`LazyTables` reads a location's
+table the first time it is accessed.
+
+Persistence is opt-in, enabled by setting ``RETAIL_DB_PATH``. The store
+is single-user: it has one namespace of locations, so every browser session
+of the server loads, and overwrites, the same records.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+from collections.abc import MutableMapping
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from retail import schema
+from retail.schema import DAY_COLUMN
+
+ENV_PATH = "RETAIL_DB_PATH"
+
+# Record keys stored in their own tables rather than in ``locations.data``.
+SEPARATE_KEYS = ("overrides", "removed", "tables")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS locations (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS overrides (
+    location TEXT NOT NULL,
+    product TEXT NOT NULL,
+    fields TEXT,
+    removed INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (location, product)
+);
+CREATE TABLE IF NOT EXISTS tables (
+    location TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    columns TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (location, kind)
+);
+CREATE TABLE IF NOT EXISTS table_rows (
+    location TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (location, kind, row)
+);
+CREATE INDEX IF NOT EXISTS table_rows_day ON table_rows (location, day);
+"""
+
+# Packed dtypes of a table row, in blob order.
+ROW_DTYPES = ("<f4", "<f8")
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _dumps(value):
+    return json.dumps(value, default=_json_default)
+
+
+def _row_dtype(columns):
+    """Structured dtype of a packed row for ``[[name, dtype], ...]``."""
+    counts = [
+        sum(np.dtype(dtype).str == packed for _, dtype in columns)
+        for packed in ROW_DTYPES
+    ]
+    return np.dtype(
+        [(packed, packed, (count,)) for packed, count in zip(ROW_DTYPES, counts)]
+    )
+
+
+def _pack(table):
+    """``(columns, days, rows)`` of ``table``: one packed blob per row.
+
+    Values are stored as they are, NaN included, so a reloaded table equals
+    the saved one.
+    """
+    names = [column for column in table.columns if column != DAY_COLUMN]
+    columns = [
+        [
+            name,
+            "float32" if table[name].dtype == schema.QUANTITY_DTYPE else "float64",
+        ]
+        for name in names
+    ]
+    packed = np.zeros(len(table), dtype=_row_dtype(columns))
+    for field in ROW_DTYPES:
+        group = [name for name, dtype in columns if np.dtype(dtype).str == field]
+        values = table[group]
+        if any(dtype.kind not in "biuf" for dtype in values.dtypes):
+            values = values.apply(pd.to_numeric, errors="coerce")
+        packed[field] = values.to_numpy(dtype=field)
+    data = packed.tobytes()
+    size = packed.dtype.itemsize
+    rows = [data[i * size : (i + 1) * size] for i in range(len(table))]
+    return columns, schema.days(table).tolist(), rows
+
+
+class LocationStore:
+    """Locations, overrides and editor tables in the SQLite file ``path``."""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        # One short-lived connection per call keeps the store usable from
+        # every Streamlit session thread.
+        return sqlite3.connect(self.path, timeout=30)
+
+    def locations(self):
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT name FROM locations ORDER BY position"
+            ).fetchall()
+        return [name for (name,) in rows]
+
+    def load_records(self):
+        """Every location record, with lazily loaded tables."""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT name, data FROM locations ORDER BY position"
+            ).fetchall()
+            overrides = connection.execute(
+                "SELECT location, product, fields, removed FROM overrides"
+            ).fetchall()
+        records = {name: json.loads(data) for name, data in rows}
+        for record in records.values():
+            if "category" in record:
+                record.setdefault("overrides", {})
+                record.setdefault("removed", [])
+        for location, product, fields, removed in overrides:
+            record = records.get(location)
+            if record is None:
+                continue
+            if removed:
+                record["removed"].append(product)
+            else:
+                record["overrides"][product] = json.loads(fields)
+        for name, record in records.items():
+            record["tables"] = LazyTables(self, name)
+        return records
+
+    def save_record(self, name, record):
+        """Write ``record``'s fields and overrides; tables are saved separately."""
+        data = {key: value for key, value in record.items() if key not in SEPARATE_KEYS}
+        overrides = [
+            (name, product, _dumps(fields), 0)
+            for product, fields in record.get("overrides", {}).items()
+        ] + [(name, product, None, 1) for product in record.get("removed", [])]
+        with closing(self._connect()) as connection, connection:
+            position = connection.execute(
+                "SELECT COALESCE("
+                "(SELECT position FROM locations WHERE name = ?), "
+                "(SELECT COUNT(*) FROM locations))",
+                (name,),
+            ).fetchone()[0]
+            connection.execute(
+                "INSERT OR REPLACE INTO locations (name, position, data) "
+                "VALUES (?, ?, ?)",
+                (name, position, _dumps(data)),
+            )
+            connection.execute("DELETE FROM overrides WHERE location = ?", (name,))
+            connection.executemany(
+                "INSERT INTO overrides (location, product, fields, removed) "
+                "VALUES (?, ?, ?, ?)",
+                overrides,
+            )
+
+    def table_kinds(self, name):
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT kind FROM tables WHERE location = ?", (name,)
+            ).fetchall()
+        return [kind for (kind,) in rows]
+
+    def load_table(self, name, kind):
+        """The stored editor table, or ``None``."""
+        with closing(self._connect()) as connection:
+            stored = connection.execute(
+                "SELECT columns FROM tables WHERE location = ? AND kind = ?",
+                (name, kind),
+            ).fetchone()
+            if stored is None:
+                return None
+            rows = connection.execute(
+                "SELECT day, data FROM table_rows WHERE location = ? AND kind = ? "
+                "ORDER BY row",
+                (name, kind),
+            ).fetchall()
+        columns = json.loads(stored[0])
+        dtype = _row_dtype(columns)
+        if dtype.itemsize:
+            packed = np.frombuffer(b"".join(data for _, data in rows), dtype=dtype)
+        else:
+            packed = np.zeros(len(rows), dtype=dtype)
+        groups = {field: iter(packed[field].T) for field in ROW_DTYPES}
+        table = pd.DataFrame(
+            {
+                name: next(groups[np.dtype(dtype).str]).astype(dtype)
+                for name, dtype in columns
+            },
+            index=pd.RangeIndex(len(rows)),
+        )
+        table.insert(
+            0, DAY_COLUMN, np.array([day for day, _ in rows], dtype=schema.DAY_DTYPE)
+        )
+        return table
+
+    def save_table(self, name, kind, table):
+        """Store ``table``; returns ``False`` when it was already stored as is.
+
+        Only rows whose day or values changed are written.
+        """
+        columns, days, rows = _pack(table)
+        encoded = _dumps(columns)
+        digest = hashlib.sha256(encoded.encode())
+        digest.update(np.asarray(days, dtype=np.int64).tobytes())
+        for row in rows:
+            digest.update(row)
+        digest = digest.hexdigest()
+        with closing(self._connect()) as connection, connection:
+            stored = connection.execute(
+                "SELECT columns, digest FROM tables WHERE location = ? AND kind = ?",
+                (name, kind),
+            ).fetchone()
+            if stored is not None and stored[1] == digest:
+                return False
+            existing = {}
+            if stored is not None and stored[0] == encoded:
+                existing = {
+                    row: (day, data)
+                    for row, day, data in connection.execute(
+                        "SELECT row, day, data FROM table_rows "
+                        "WHERE location = ? AND kind = ?",
+                        (name, kind),
+                    )
+                }
+            connection.execute(
+                "DELETE FROM table_rows WHERE location = ? AND kind = ? AND row >= ?",
+                (name, kind, len(rows) if existing else 0),
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO table_rows (location, kind, row, day, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    (name, kind, i, day, data)
+                    for i, (day, data) in enumerate(zip(days, rows))
+                    if existing.get(i) != (day, data)
+                ),
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO tables (location, kind, columns, digest) "
+                "VALUES (?, ?, ?, ?)",
+                (name, kind, encoded, digest),
+            )
+        return True
+
+
+class LazyTables(MutableMapping):
+    """A location's ``tables`` dict that reads each table on first access."""
+
+    def __init__(self, store, location):
+        self.store = store
+        self.location = location
+        self._kinds = None
+        self._tables = {}
+
+    def _stored_kinds(self):
+        if self._kinds is None:
+            self._kinds = self.store.table_kinds(self.location)
+        return self._kinds
+
+    def is_loaded(self, kind):
+        return kind in self._tables
+
+    def __getitem__(self, kind):
+        if kind not in self._tables:
+            if kind not in self._stored_kinds():
+                raise KeyError(kind)
+            self._tables[kind] = self.store.load_table(self.location, kind)
+        return self._tables[kind]
+
+    def __setitem__(self, kind, table):
+        self._tables[kind] = table
+
+    def __delitem__(self, kind):
+        self._tables.pop(kind)
+        if kind in self._stored_kinds():
+            self._kinds = [stored for stored in self._kinds if stored != kind]
+
+    def __iter__(self):
+        kinds = list(self._tables)
+        kinds += [kind for kind in self._stored_kinds() if kind not in self._tables]
+        return iter(kinds)
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+    def __repr__(self):
+        return f"LazyTables({self.location!r}, kinds={list(self)})"
+
+
+@functools.lru_cache(maxsize=None)
+def _shared(path):
+    return LocationStore(path)
+
+
+def shared():
+    """Process-wide store at ``$RETAIL_DB_PATH``, or ``None`` when it is unset."""
+    path = os.environ.get(ENV_PATH)
+    return _shared(path) if path else None
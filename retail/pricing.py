@@ -0,0 +1,230 @@
+"""Break-even pricing for the Price Strategy tab.
+
+A location pays its rental cost plus an overflow fee for every unit of volume
+stocked beyond ``rental_size``. Those fixed costs are shared between products
+by the volume their planned stock occupies, and each product must also
+recover the purchase cost of its whole planned stock from the units it is
+expected to sell.
+
+All functions broadcast: products are the last axis and any leading axes
+(locations, demand scenarios, stock scenarios) are carried through.
+
+Price optimisation fits a constant-elasticity demand curve
+``units = scale * price ** elasticity`` per product from recorded prices and
+units sold (a least-squares line in log-log space), then evaluates profit on
+a grid of candidate prices for every location and product at once.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class BreakEven:
+    """Minimum prices per unit that cover all costs."""
+
+    min_price: np.ndarray
+    average_price: np.ndarray
+    fixed_cost: np.ndarray
+    overflow_volume: np.ndarray
+
+
+@dataclass
+class Elasticity:
+    """Fitted ``units = scale * price ** elasticity`` per product."""
+
+    elasticity: np.ndarray
+    scale: np.ndarray
+    r_squared: np.ndarray
+    observations: np.ndarray
+
+
+@dataclass
+class PriceRecommendation:
+    """Profit-maximising grid price per product and the expected outcome."""
+
+    price: np.ndarray
+    units: np.ndarray
+    profit: np.ndarray
+    at_bound: np.ndarray
+    location_profit: np.ndarray
+
+
+def break_even_prices(
+    costs, dimension, stock, sold, rental_cost, rental_size, overflow_fee=0.0
+):
+    """Minimum price per unit for every product.
+
+    ``costs``, ``dimension``, ``stock`` and ``sold`` are ``(..., P)``;
+    ``rental_cost``, ``rental_size`` and ``overflow_fee`` are ``(...)``.
+    Expected sales are capped at the planned stock. Products that sell
+    nothing get an infinite minimum price.
+    """
+    costs = np.asarray(costs, dtype=float)
+    dimension = np.asarray(dimension, dtype=float)
+    stock = np.asarray(stock, dtype=float)
+    sold = np.minimum(np.asarray(sold, dtype=float), stock)
+
+    volume = stock * dimension
+    total_volume = volume.sum(axis=-1)
+    overflow_volume = np.clip(
+        total_volume - np.asarray(rental_size, dtype=float), 0, None
+    )
+    fixed_cost = np.asarray(rental_cost, dtype=float) + overflow_volume * np.asarray(
+        overflow_fee, dtype=float
+    )
+
+    # Share fixed costs by occupied volume, or by units sold if nothing
+    # takes up space.
+    total_sold = sold.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share = np.where(
+            total_volume[..., None] > 0,
+            volume / total_volume[..., None],
+            sold / total_sold[..., None],
+        )
+        share = np.nan_to_num(share)
+        product_cost = stock * costs
+        min_price = np.where(
+            sold > 0, (product_cost + fixed_cost[..., None] * share) / sold, np.inf
+        )
+        average_price = np.where(
+            total_sold > 0,
+            (product_cost.sum(axis=-1) + fixed_cost) / total_sold,
+            np.inf,
+        )
+    return BreakEven(
+        min_price=min_price,
+        average_price=average_price,
+        fixed_cost=fixed_cost,
+        overflow_volume=overflow_volume,
+    )
+
+
+def break_even_surface(
+    costs,
+    dimension,
+    stock,
+    sold,
+    rental_cost,
+    rental_size,
+    overflow_fee=0.0,
+    demand_scale=None,
+    stock_scale=None,
+):
+    """Sweep demand and stock multipliers in one vectorized pass.
+
+    Returns a :class:`BreakEven` whose arrays gain two leading axes,
+    ``(len(demand_scale), len(stock_scale), ...)``. Scaled demand is still
+    capped at the scaled stock. Both scales default to 50 steps between
+    25% and 200% of the plan.
+    """
+    if demand_scale is None:
+        demand_scale = np.linspace(0.25, 2.0, 50)
+    if stock_scale is None:
+        stock_scale = np.linspace(0.25, 2.0, 50)
+    demand_scale = np.asarray(demand_scale, dtype=float)
+    stock_scale = np.asarray(stock_scale, dtype=float)
+    stock = np.asarray(stock, dtype=float)
+    sold = np.asarray(sold, dtype=float)
+    extra = (1,) * stock.ndim
+    return break_even_prices(
+        costs,
+        dimension,
+        stock * stock_scale.reshape((1, -1) + extra),
+        sold * demand_scale.reshape((-1, 1) + extra),
+        rental_cost,
+        rental_size,
+        overflow_fee,
+    )
+
+
+def fit_elasticity(prices, units):
+    """Fit a log-log demand curve along the first (day) axis.
+
+    ``prices`` and ``units`` are ``(D, ..., P)``. Days where either is not
+    positive are ignored. Products with fewer than two observations or a
+    constant price get ``nan``.
+    """
+    prices = np.asarray(prices, dtype=float)
+    units = np.asarray(units, dtype=float)
+    valid = (prices > 0) & (units > 0)
+    count = valid.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_price = np.where(valid, np.log(np.where(valid, prices, 1.0)), 0.0)
+        log_units = np.where(valid, np.log(np.where(valid, units, 1.0)), 0.0)
+        mean_price = log_price.sum(axis=0) / count
+        mean_units = log_units.sum(axis=0) / count
+        dev_price = np.where(valid, log_price - mean_price, 0.0)
+        dev_units = np.where(valid, log_units - mean_units, 0.0)
+        var_price = (dev_price**2).sum(axis=0)
+        var_units = (dev_units**2).sum(axis=0)
+        cov = (dev_price * dev_units).sum(axis=0)
+        elasticity = np.where(
+            (count >= 2) & (var_price > 1e-12), cov / var_price, np.nan
+        )
+        intercept = mean_units - elasticity * mean_price
+        r_squared = np.where(var_units > 0, cov**2 / (var_price * var_units), np.nan)
+    return Elasticity(
+        elasticity=elasticity,
+        scale=np.exp(intercept),
+        r_squared=np.where(np.isnan(elasticity), np.nan, r_squared),
+        observations=count,
+    )
+
+
+def optimise_prices(
+    costs,
+    elasticity,
+    scale,
+    reference_price,
+    rental_cost=0.0,
+    period_days=30,
+    multipliers=None,
+):
+    """Grid-search the profit-maximising price of every product.
+
+    Inputs are ``(..., P)`` arrays (``rental_cost`` is ``(...)``). Candidates
+    are ``reference_price * multipliers`` (default 151 steps from 50% to
+    200%). Profit is ``(price - costs) * units`` per day;
+    ``location_profit`` is the period profit of all products minus the
+    location's rental cost. ``at_bound`` marks prices at the edge of the
+    grid, e.g. for inelastic products whose profit keeps rising with price.
+    Products without a fitted curve keep their reference price.
+    """
+    if multipliers is None:
+        multipliers = np.linspace(0.5, 2.0, 151)
+    multipliers = np.asarray(multipliers, dtype=float)
+    costs = np.asarray(costs, dtype=float)
+    elasticity = np.asarray(elasticity, dtype=float)
+    scale = np.asarray(scale, dtype=float)
+    reference_price = np.asarray(reference_price, dtype=float)
+
+    shape = (-1,) + (1,) * np.broadcast(costs, elasticity, reference_price).ndim
+    candidates = reference_price * multipliers.reshape(shape)
+    fitted = np.isfinite(elasticity) & np.isfinite(scale) & (reference_price > 0)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        units = np.where(
+            fitted, scale * np.power(candidates, np.where(fitted, elasticity, 0)), 0
+        )
+        profit = (candidates - costs) * units
+    best = np.nanargmax(np.where(np.isfinite(profit), profit, -np.inf), axis=0)
+
+    def pick(values):
+        return np.take_along_axis(values, best[np.newaxis], axis=0)[0]
+
+    price = np.where(fitted, pick(candidates), reference_price)
+    best_units = np.where(fitted, pick(units), np.nan)
+    best_profit = np.where(fitted, pick(profit), np.nan)
+    at_bound = fitted & ((best == 0) | (best == len(multipliers) - 1))
+    location_profit = np.nansum(best_profit, axis=-1) * period_days - np.asarray(
+        rental_cost, dtype=float
+    )
+    return PriceRecommendation(
+        price=price,
+        units=best_units,
+        profit=best_profit,
+        at_bound=at_bound,
+        location_profit=location_profit,
+    )
@@ -0,0 +1,114 @@
+"""Opt-in timing of page sections and calculations.
+
+A :class:`Profiler` keeps the section timings of the last ``window`` script
+runs. While disabled, :meth:`Profiler.section` does nothing, so the page can
+stay instrumented at no measurable cost.
+"""
+
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+ENV_FLAG = "RETAIL_PROFILE"
+
+
+def enabled_by_env():
+    return os.environ.get(ENV_FLAG, "").lower() in ("1", "true", "yes", "on")
+
+
+class Profiler:
+    """Rolling per-section timings over the last ``window`` runs."""
+
+    def __init__(self, window=50):
+        self.window = window
+        self.enabled = enabled_by_env()
+        self.run = 0
+        self.records = deque()
+
+    def start_run(self):
+        self.run += 1
+        while self.records and self.records[0][0] <= self.run - self.window:
+            self.records.popleft()
+
+    @contextmanager
+    def section(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        if self.enabled:
+            self.records.append((self.run, name, seconds, time.time()))
+
+    def timed(self, name):
+        """Decorator timing every call of the wrapped function as ``name``."""
+
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.section(name):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def frame(self):
+        return pd.DataFrame(
+            list(self.records), columns=["run", "section", "seconds", "timestamp"]
+        )
+
+    def summary(self):
+        """Per-section calls and last/mean/p95/max milliseconds."""
+        frame = self.frame()
+        if frame.empty:
+            return pd.DataFrame(
+                columns=["section", "calls", "last_ms", "mean_ms", "p95_ms", "max_ms"]
+            )
+        milliseconds = frame.assign(ms=frame["seconds"] * 1000).groupby(
+            "section", sort=False
+        )["ms"]
+        summary = pd.DataFrame(
+            {
+                "calls": milliseconds.size(),
+                "last_ms": milliseconds.last(),
+                "mean_ms": milliseconds.mean(),
+                "p95_ms": milliseconds.quantile(0.95),
+                "max_ms": milliseconds.max(),
+            }
+        )
+        return summary.sort_values("mean_ms", ascending=False).reset_index()
+
+    def dump(self, path, context=None):
+        """Write raw records and the summary to ``path`` (``.json`` or ``.csv``)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if path.endswith(".csv"):
+            self.frame().to_csv(path, index=False)
+        else:
+            with open(path, "w") as file:
+                json.dump(
+                    {
+                        "context": context or {},
+                        "summary": self.summary().to_dict(orient="records"),
+                        "records": self.frame().to_dict(orient="records"),
+                    },
+                    file,
+                    indent=2,
+                    default=lambda value: (
+                        value.item() if isinstance(value, np.generic) else str(value)
+                    ),
+                )
+        return path
@@ -0,0 +1,144 @@
+"""Typed schema of the editor tables.
+
+Frames coming back from ``st.data_editor``, file imports or the store are
+coerced once, at the edge, to compact dtypes::
+
+    Day                        int32
+    unit counts (day tables)   float32
+    currency (day tables)      float64
+    product plans              categorical ``product`` + float32 columns
+    product table              categorical ``product`` + numeric fields
+
+Blank and non-numeric cells become 0, or stay NaN where ``blank=np.nan``
+is passed (tables in which a blank day is no observation at all rather
+than a day without sales). Unit counts are small whole numbers
+and fit ``float32`` exactly; currency columns (sales, accumulated COGS,
+prices) grow into the millions and keep ``float64`` so running totals do
+not lose cents. The columns of each dtype live in one contiguous block, so
+:func:`matrix` hands the engines a ``(D, P)`` array without per-column
+conversions.
+
+Product fields (costs, prices, shelf life, dimensions) keep ``float64``:
+they are compared with the catalog values to find a location's overrides.
+"""
+
+import numpy as np
+import pandas as pd
+
+DAY_COLUMN = "Day"
+PRODUCT_COLUMN = "product"
+DAY_DTYPE = np.int32
+QUANTITY_DTYPE = np.float32
+CURRENCY_DTYPE = np.float64
+
+
+def _numeric(frame, dtype, blank=0.0):
+    if any(dtype.kind not in "biuf" for dtype in frame.dtypes):
+        frame = frame.apply(pd.to_numeric, errors="coerce")
+    return np.nan_to_num(frame.to_numpy(dtype=dtype), nan=blank)
+
+
+def _check_columns(frame):
+    duplicated = frame.columns[frame.columns.duplicated()]
+    if len(duplicated):
+        raise ValueError(f"duplicate columns: {', '.join(map(str, duplicated))}")
+
+
+def matrix(frame, columns, dtype=QUANTITY_DTYPE, blank=0.0):
+    """Contiguous ``(D, P)`` matrix of ``columns``; missing are ``blank``."""
+    return np.ascontiguousarray(
+        _numeric(frame.reindex(columns=list(columns)), dtype, blank)
+    )
+
+
+def days(frame, day_column=DAY_COLUMN):
+    """``int32`` day numbers of ``frame``; blank days are 0."""
+    if day_column not in frame.columns:
+        return np.zeros(len(frame), dtype=DAY_DTYPE)
+    return _numeric(frame[[day_column]], np.float64)[:, 0].astype(DAY_DTYPE)
+
+
+def _typed_table(day, columns, currency, values_of):
+    currency = set(currency)
+    blocks = {}
+    for dtype, names in [
+        (QUANTITY_DTYPE, [column for column in columns if column not in currency]),
+        (CURRENCY_DTYPE, [column for column in columns if column in currency]),
+    ]:
+        values = values_of(names, dtype)
+        blocks.update((name, values[:, j]) for j, name in enumerate(names))
+    return pd.DataFrame(
+        {DAY_COLUMN: day, **{column: blocks[column] for column in columns}}
+    )
+
+
+def day_table(frame, columns=None, currency=(), blank=0.0):
+    """``frame`` with an ``int32`` ``Day`` first and typed value columns.
+
+    ``columns`` are the value columns to keep (missing ones are ``blank``);
+    by default every column of ``frame`` except ``Day``. Columns listed in
+    ``currency`` are ``float64``, the others ``float32`` unit counts.
+    """
+    _check_columns(frame)
+    if columns is None:
+        columns = [column for column in frame.columns if column != DAY_COLUMN]
+    else:
+        columns = [column for column in columns if column != DAY_COLUMN]
+    return _typed_table(
+        days(frame),
+        columns,
+        currency,
+        lambda names, dtype: matrix(frame, names, dtype, blank),
+    )
+
+
+def empty_day_table(columns, num_rows=0, currency=(), blank=0.0):
+    """Day table of ``blank`` cells with days ``1..num_rows``."""
+    columns = [column for column in columns if column != DAY_COLUMN]
+    return _typed_table(
+        np.arange(1, num_rows + 1, dtype=DAY_DTYPE),
+        columns,
+        currency,
+        lambda names, dtype: np.full((num_rows, len(names)), blank, dtype=dtype),
+    )
+
+
+def _products(frame):
+    if PRODUCT_COLUMN not in frame.columns:
+        raise ValueError(f"missing '{PRODUCT_COLUMN}' column")
+    names = frame[PRODUCT_COLUMN]
+    keep = names.notna() & (names.astype(str).str.strip() != "")
+    names = names[keep].astype(str)
+    duplicated = names[names.duplicated()].unique()
+    if len(duplicated):
+        raise ValueError(f"duplicate products: {', '.join(duplicated)}")
+    return keep.to_numpy(), pd.Categorical(names, categories=names)
+
+
+def plan_table(frame, columns):
+    """Per-product plan with a categorical ``product`` and ``float32`` columns.
+
+    Rows without a product name are dropped; duplicate names are an error.
+    """
+    _check_columns(frame)
+    keep, products = _products(frame)
+    table = pd.DataFrame(matrix(frame[keep], columns), columns=list(columns))
+    table.insert(0, PRODUCT_COLUMN, products)
+    return table
+
+
+def product_records(frame):
+    """``{product: {field: value}}`` from the edited product table.
+
+    Rows without a product name are dropped; duplicate names are an error.
+    Numeric fields become Python floats (``nan`` when blank).
+    """
+    _check_columns(frame)
+    keep, products = _products(frame)
+    fields = [column for column in frame.columns if column != PRODUCT_COLUMN]
+    values = frame.loc[keep, fields].apply(pd.to_numeric, errors="coerce")
+    columns = {field: values[field].to_numpy(dtype=float).tolist() for field in fields}
+    return {
+        product: {field: columns[field][i] for field in fields}
+        for i, product in enumerate(products.categories.tolist())
+    }
@@ -0,0 +1,145 @@
+"""Day-by-day inventory simulation.
+
+Stock is held as an ``(L, P, A)`` array of units by location, product and
+age in days, so every location and product advances together each day:
+
+1. restocks arrive with age 0;
+2. demand is served oldest stock first, unmet demand is a lost sale;
+3. volume beyond ``rental_size`` is charged the daily overflow fee;
+4. stock ages one day and perishable units reaching ``Shelf_Life`` are
+   wasted. A ``Shelf_Life`` of 0 means the product never expires.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class SimulationResult:
+    """Per-location, per-product ``(L, P)`` totals of a simulation run."""
+
+    ending_stock: np.ndarray
+    sold: np.ndarray
+    lost_sales: np.ndarray
+    stockout_days: np.ndarray
+    waste: np.ndarray
+    overflow_cost: np.ndarray
+    stock_level: np.ndarray = None
+
+
+def periodic_schedule(quantity, days, every, start=0):
+    """Daily ``(D, ..., P)`` schedule with ``quantity`` every ``every`` days."""
+    quantity = np.asarray(quantity, dtype=float)
+    on_day = np.zeros(days)
+    if every > 0:
+        on_day[start::every] = 1.0
+    return on_day.reshape((days,) + (1,) * quantity.ndim) * quantity
+
+
+def simulate_inventory(
+    dimension,
+    shelf_life,
+    rental_size,
+    restock,
+    demand,
+    overflow_fee=0.0,
+    initial_stock=0.0,
+    record=False,
+):
+    """Simulate stock for every location and product at once.
+
+    ``dimension`` and ``shelf_life`` are ``(..., P)``; ``rental_size`` and
+    ``overflow_fee`` are per location ``(...)``. ``restock`` and ``demand``
+    are daily ``(D, ..., P)`` schedules (see :func:`periodic_schedule`) and
+    broadcast against each other. ``initial_stock`` starts at age 0. With
+    ``record=True`` the end-of-day stock per product is kept as
+    ``stock_level`` ``(D, ..., P)``.
+    """
+    dimension = np.asarray(dimension, dtype=float)
+    shelf_life = np.rint(np.asarray(shelf_life, dtype=float)).astype(int)
+    rental_size = np.asarray(rental_size, dtype=float)
+    overflow_fee = np.asarray(overflow_fee, dtype=float)
+    restock = np.asarray(restock, dtype=float)
+    demand = np.asarray(demand, dtype=float)
+
+    days = np.broadcast_shapes(restock.shape[:1], demand.shape[:1])[0]
+    shape = np.broadcast_shapes(
+        dimension.shape,
+        shelf_life.shape,
+        restock.shape[1:],
+        demand.shape[1:],
+        np.shape(initial_stock),
+        rental_size.shape + (1,),
+        overflow_fee.shape + (1,),
+    )
+    restock = np.broadcast_to(restock, (days,) + shape)
+    demand = np.broadcast_to(demand, (days,) + shape)
+    dimension = np.broadcast_to(dimension, shape)
+    shelf_life = np.broadcast_to(shelf_life, shape)
+
+    # Age buckets are stored oldest first: index ``ages - 1`` holds stock
+    # that arrived today and index 0 collects non-perishables of any age.
+    ages = max(int(shelf_life.max(initial=0)), 0) + 1
+    perishable = shelf_life > 0
+    expire_index = np.where(perishable, ages - 1 - shelf_life, 0)[..., None]
+    stock = np.zeros(shape + (ages,))
+    stock[..., -1] = initial_stock
+    cumulative = np.empty_like(stock)
+
+    sold = np.zeros(shape)
+    lost_sales = np.zeros(shape)
+    stockout_days = np.zeros(shape)
+    waste = np.zeros(shape)
+    overflow_cost = np.zeros(shape)
+    stock_level = np.empty((days,) + shape) if record else None
+
+    for day in range(days):
+        stock[..., -1] += restock[day]
+
+        # Serve oldest stock first: whatever is left of the running total
+        # after removing today's demand is what stays in each bucket.
+        np.cumsum(stock, axis=-1, out=cumulative)
+        on_hand = cumulative[..., -1].copy()
+        sold_today = np.minimum(demand[day], on_hand)
+        cumulative -= demand[day][..., None]
+        np.clip(cumulative, 0, None, out=cumulative)
+        stock[..., 0] = cumulative[..., 0]
+        np.subtract(cumulative[..., 1:], cumulative[..., :-1], out=stock[..., 1:])
+        on_hand -= sold_today
+        sold += sold_today
+        unmet = demand[day] - sold_today
+        lost_sales += unmet
+        stockout_days += unmet > 0
+
+        volume = on_hand * dimension
+        total_volume = volume.sum(axis=-1)
+        overflow = np.clip(total_volume - rental_size, 0, None) * overflow_fee
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = np.nan_to_num(volume / total_volume[..., None])
+        overflow_cost += overflow[..., None] * share
+        if record:
+            stock_level[day] = on_hand
+
+        if ages > 1:
+            stock[..., 0] += stock[..., 1]
+            stock[..., 1:-1] = stock[..., 2:]
+            stock[..., -1] = 0.0
+            expiring = np.take_along_axis(stock, expire_index, axis=-1)
+            waste += np.where(perishable, expiring[..., 0], 0.0)
+            np.put_along_axis(
+                stock,
+                expire_index,
+                np.where(perishable[..., None], 0.0, expiring),
+                axis=-1,
+            )
+
+    return SimulationResult(
+        ending_stock=stock.sum(axis=-1),
+        sold=sold,
+        lost_sales=lost_sales,
+        stockout_days=stockout_days,
+        waste=waste,
+        overflow_cost=overflow_cost,
+        stock_level=stock_level,
+    )
@@ -0,0 +1,63 @@
+"""Background warm-up of the analysis stack.
+
+The home page only needs Streamlit, while the analysis pages import pandas,
+numpy, plotly and the ``retail`` modules, about half a second on a cold
+interpreter. :func:`warm_up` imports them on a daemon thread once per
+process, so they are usually loaded by the time a visitor opens an
+analysis page; a page that gets there first waits for the same imports it
+would have run anyway.
+"""
+
+import importlib
+import threading
+
+MODULES = (
+    "numpy",
+    "pandas",
+    "retail.catalog",
+    "retail.engine",
+    "retail.timeseries",
+    "retail.schema",
+    "retail.ingest",
+    "retail.persistence",
+    "retail.cache",
+    "retail.jobs",
+    "retail.profiling",
+    "retail.stateview",
+    "retail.optimizer",
+    "retail.simulation",
+    "retail.montecarlo",
+    "retail.pricing",
+    "retail.forecast",
+    "retail.stats",
+    "retail.dashboard",
+    "retail.charts",
+    "plotly.express",
+)
+
+_lock = threading.Lock()
+_thread = None
+
+
+def _import_all(modules):
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            # The page that needs the module reports the error.
+            pass
+
+
+def warm_up(modules=MODULES):
+    """Import ``modules`` on a background thread; later calls do nothing."""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(
+                target=_import_all,
+                args=(tuple(modules),),
+                name="retail-warm-up",
+                daemon=True,
+            )
+            _thread.start()
+    return _thread
@@ -0,0 +1,156 @@
+"""Bounded previews of session-state records for the sidebar debug view.
+
+Instead of serialising a whole location record, the viewer shows a one-row
+summary per key and renders a single selected section one page at a time.
+Nested containers are shown as short placeholders until they are selected,
+tables that have not been loaded yet are not loaded, and every rendered page
+is trimmed to a character budget.
+"""
+
+import json
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+PAGE_SIZE = 25
+PAYLOAD_BUDGET = 20_000
+
+
+def _is_container(value):
+    return isinstance(value, (Mapping, list, tuple, pd.DataFrame))
+
+
+def _size(value):
+    if isinstance(value, pd.DataFrame):
+        return f"{value.shape[0]} x {value.shape[1]}"
+    if isinstance(value, (Mapping, list, tuple, str)):
+        return str(len(value))
+    return ""
+
+
+def _bytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=False).sum())
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    return None
+
+
+def _scalar(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = str(value)
+    return text if len(text) <= 80 else text[:77] + "..."
+
+
+def _placeholder(value):
+    if isinstance(value, pd.DataFrame):
+        return f"<DataFrame {value.shape[0]} x {value.shape[1]}>"
+    if isinstance(value, (Mapping, list, tuple)):
+        return f"<{type(value).__name__}, {len(value)} items>"
+    return _scalar(value)
+
+
+def _loaded(container, key):
+    is_loaded = getattr(container, "is_loaded", None)
+    return is_loaded is None or is_loaded(key)
+
+
+def summary(record):
+    """One row per key of ``record`` with its type, size and array bytes."""
+    rows = []
+    for key in record:
+        if not _loaded(record, key):
+            rows.append({"key": str(key), "type": "not loaded", "size": ""})
+            continue
+        value = record[key]
+        rows.append(
+            {
+                "key": str(key),
+                "type": type(value).__name__,
+                "size": _size(value),
+                "bytes": _bytes(value),
+                "value": "" if _is_container(value) else str(_scalar(value)),
+            }
+        )
+    return pd.DataFrame(rows, columns=["key", "type", "size", "bytes", "value"])
+
+
+def children(value):
+    """Keys of the nested containers of ``value`` that can be expanded."""
+    if isinstance(value, Mapping):
+        return [
+            key for key in value if not _loaded(value, key) or _is_container(value[key])
+        ]
+    if isinstance(value, (list, tuple)):
+        return [i for i, item in enumerate(value) if _is_container(item)]
+    return []
+
+
+def num_pages(value, page_size=PAGE_SIZE):
+    length = len(value) if _is_container(value) else 1
+    return max(1, -(-length // page_size))
+
+
+def _page(value, page, page_size):
+    start = page * page_size
+    if isinstance(value, pd.DataFrame):
+        frame = value.iloc[start : start + page_size, :page_size]
+        payload = {
+            "columns": [str(column) for column in frame.columns],
+            "rows": [[_scalar(item) for item in row] for row in frame.to_numpy()],
+        }
+        if value.shape[1] > page_size:
+            payload["hidden_columns"] = value.shape[1] - page_size
+        return payload
+    if isinstance(value, Mapping):
+        keys = list(value)[start : start + page_size]
+        return {
+            str(key): (
+                _placeholder(value[key]) if _loaded(value, key) else "<not loaded>"
+            )
+            for key in keys
+        }
+    if isinstance(value, (list, tuple)):
+        return [_placeholder(item) for item in value[start : start + page_size]]
+    return _scalar(value)
+
+
+def _length(payload):
+    return len(json.dumps(payload, default=str))
+
+
+def preview(value, page=0, page_size=PAGE_SIZE, budget=PAYLOAD_BUDGET):
+    """JSON-able page ``page`` of ``value``, at most ``budget`` characters."""
+    payload = _page(value, page, page_size)
+    if _length(payload) <= budget:
+        return payload
+
+    # Drop entries from the end until the page fits the budget.
+    if isinstance(payload, dict) and "rows" in payload:
+        items = payload["rows"]
+    elif isinstance(payload, dict):
+        items = list(payload.items())
+    elif isinstance(payload, list):
+        items = payload
+    else:
+        return _scalar(str(payload)[:budget])
+    low, high = 0, len(items)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if _length(items[:middle]) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    kept = items[:low]
+    if isinstance(payload, dict) and "rows" in payload:
+        trimmed = dict(payload, rows=kept, hidden_rows=len(items) - low)
+    elif isinstance(payload, dict):
+        trimmed = dict(kept)
+        trimmed["..."] = f"{len(items) - low} more over the payload budget"
+    else:
+        trimmed = kept + [f"... {len(items) - low} more over the payload budget"]
+    return trimmed
@@ -0,0 +1,174 @@
+"""Bootstrap significance tests for before/after marketing comparisons.
+
+Resamples are drawn as multinomial day counts, so the mean of every
+product in every resample is one matrix product ``counts @ values``. The
+resamples are processed in chunks and the products in blocks, keeping
+memory bounded for long windows and large catalogs; each chunk's counts
+come from its own child of one ``numpy.random.SeedSequence`` and are reused
+for every product block, so the result does not depend on the block size.
+
+Blank (NaN) days are not observations: each product is resampled over its
+own non-blank before and after days. Products with the same numbers of
+such days share their resampled day counts.
+"""
+
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class LiftTest:
+    """Per-product mean daily lift with bootstrap intervals and p-values."""
+
+    products: list
+    before_days: np.ndarray
+    after_days: np.ndarray
+    before_mean: np.ndarray
+    after_mean: np.ndarray
+    lift: np.ndarray
+    lift_pct: np.ndarray
+    ci_low: np.ndarray
+    ci_high: np.ndarray
+    ci_low_pct: np.ndarray
+    ci_high_pct: np.ndarray
+    p_value: np.ndarray
+    resamples: int
+    confidence: float
+
+    def to_frame(self):
+        percent = f"{self.confidence:.0%}"
+        return pd.DataFrame(
+            {
+                "Before Days": self.before_days,
+                "After Days": self.after_days,
+                "Before (Mean/Day)": self.before_mean,
+                "After (Mean/Day)": self.after_mean,
+                "Lift (Units/Day)": self.lift,
+                f"Lift {percent} CI Low": self.ci_low,
+                f"Lift {percent} CI High": self.ci_high,
+                "Lift (%)": self.lift_pct,
+                f"Lift (%) {percent} CI Low": self.ci_low_pct,
+                f"Lift (%) {percent} CI High": self.ci_high_pct,
+                "p-value": self.p_value,
+            },
+            index=pd.Index(self.products, name="Product"),
+        )
+
+
+def _resampled_means(rng, values, size):
+    days = values.shape[0]
+    counts = rng.multinomial(days, np.full(days, 1.0 / days), size=size)
+    return counts.astype(np.float32) @ values / days
+
+
+def _observed(values):
+    """Non-blank days of every column moved to the top, and their counts."""
+    blank = np.isnan(values)
+    order = np.argsort(blank, axis=0, kind="stable")
+    values = np.nan_to_num(np.take_along_axis(values, order, axis=0))
+    return values, (~blank).sum(axis=0)
+
+
+def _bootstrap_block(before, after, seeds, sizes, quantiles):
+    """Intervals and p-values of products sharing their window lengths."""
+    lifts, ratios = [], []
+    for child, size in zip(seeds, sizes):
+        rng = np.random.default_rng(child)
+        resampled_before = _resampled_means(rng, before, size)
+        resampled_after = _resampled_means(rng, after, size)
+        lifts.append(resampled_after - resampled_before)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios.append(
+                np.where(
+                    resampled_before > 0,
+                    (resampled_after / resampled_before - 1) * 100,
+                    np.nan,
+                )
+            )
+    lift = np.concatenate(lifts)
+    ratio = np.concatenate(ratios)
+    with warnings.catch_warnings():
+        # Products without sales before marketing have no relative lift.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        ci_pct = np.nanquantile(ratio, quantiles, axis=0)
+    p_value = np.minimum(
+        1.0, 2 * np.minimum((lift <= 0).mean(axis=0), (lift >= 0).mean(axis=0))
+    )
+    return np.quantile(lift, quantiles, axis=0), ci_pct, p_value
+
+
+def bootstrap_lift(
+    before,
+    after,
+    resamples=10_000,
+    confidence=0.95,
+    seed=0,
+    products=None,
+    chunk_size=1_000,
+    max_elements=2**24,
+):
+    """Two-sample bootstrap of the mean daily lift of every product.
+
+    ``before`` is ``(n, P)`` and ``after`` ``(m, P)`` daily units; NaN days
+    are left out per product, and products without a before or an after day
+    get NaN results. Intervals are percentile intervals of ``after - before``
+    and of the relative lift; p-values are two-sided,
+    ``2 * min(P(lift <= 0), P(lift >= 0))``.
+    """
+    before = np.asarray(before, dtype=np.float32)
+    after = np.asarray(after, dtype=np.float32)
+    if before.ndim != 2 or after.ndim != 2 or before.shape[1] != after.shape[1]:
+        raise ValueError("before and after must be (days, products) arrays")
+    if before.shape[0] == 0 or after.shape[0] == 0:
+        raise ValueError("before and after need at least one day")
+    num_products = before.shape[1]
+    if products is None:
+        products = list(range(num_products))
+
+    before, before_days = _observed(before)
+    after, after_days = _observed(after)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        before_mean = before.sum(axis=0, dtype=np.float64) / before_days
+        after_mean = after.sum(axis=0, dtype=np.float64) / after_days
+    alpha = (1 - confidence) / 2
+    quantiles = [alpha, 1 - alpha]
+
+    seeds = np.random.SeedSequence(seed).spawn(-(-resamples // chunk_size))
+    sizes = [min(chunk_size, resamples - i * chunk_size) for i in range(len(seeds))]
+    block = max(1, min(num_products, max_elements // max(resamples, 1)))
+
+    ci = np.full((2, num_products), np.nan)
+    ci_pct = np.full((2, num_products), np.nan)
+    p_value = np.full(num_products, np.nan)
+    windows = np.stack([before_days, after_days], axis=1)
+    for n, m in np.unique(windows[(windows > 0).all(axis=1)], axis=0):
+        group = np.flatnonzero((before_days == n) & (after_days == m))
+        for start in range(0, len(group), block):
+            columns = group[start : start + block]
+            ci[:, columns], ci_pct[:, columns], p_value[columns] = _bootstrap_block(
+                before[:n, columns], after[:m, columns], seeds, sizes, quantiles
+            )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lift_pct = np.where(
+            before_mean > 0, (after_mean / before_mean - 1) * 100, np.nan
+        )
+    return LiftTest(
+        products=list(products),
+        before_days=before_days,
+        after_days=after_days,
+        before_mean=before_mean,
+        after_mean=after_mean,
+        lift=after_mean - before_mean,
+        lift_pct=lift_pct,
+        ci_low=ci[0],
+        ci_high=ci[1],
+        ci_low_pct=ci_pct[0],
+        ci_high_pct=ci_pct[1],
+        p_value=p_value,
+        resamples=int(resamples),
+        confidence=confidence,
+    )
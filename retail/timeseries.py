@@ -0,0 +1,204 @@
+"""Long-format time-series store for the editor tables.
+
+The editors use wide frames with one column per product and metric, e.g.
+``"Apple Juice_Sales"``. Here every value is one row keyed by ``location``,
+``product``, ``day`` and ``metric`` with compact dtypes (categoricals,
+``int32`` days, ``float32`` unit counts or ``float64`` currency values),
+so per-product work such as COGS de-accumulation, totals and before/after
+comparisons is a single grouped operation that scales linearly with
+products and days.
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from retail import schema
+from retail.catalog import product_names
+
+KEYS = ["location", "product", "day", "metric"]
+
+# Wide editor column name of every metric.
+COLUMN_TEMPLATES = {
+    "Sales": "{product}_Sales",
+    "COGS(Acc.)": "{product}_COGS(Acc.)",
+    "COGS(Non-Acc.)": "{product}_COGS(Non-Acc.)",
+    "UnitSold": "UnitSold - {product}",
+    "UnitSold-Before": "{product}_UnitSold-Before",
+    "UnitSold-After": "{product}_UnitSold-After",
+    "Price": "{product}_Price",
+    "Demand": "{product}_Demand",
+}
+
+# Money metrics, kept in float64 (see retail.schema).
+CURRENCY_METRICS = ("Sales", "COGS(Acc.)", "COGS(Non-Acc.)", "Price")
+
+# Running totals: a blank day repeats the previous total rather than zero.
+ACCUMULATED_METRICS = ("COGS(Acc.)",)
+
+# Metrics held by each editor table, in column order.
+TABLE_METRICS = {
+    "cogs": ("Sales", "COGS(Acc.)"),
+    "velocity": ("UnitSold",),
+    "marketing": ("UnitSold-Before", "UnitSold-After"),
+    "pricing": ("Price", "Demand"),
+}
+
+
+def column_name(product, metric):
+    return COLUMN_TEMPLATES[metric].format(product=product)
+
+
+def _categorical(values, categories):
+    return pd.Categorical(values, categories=pd.Index(categories).unique())
+
+
+def to_long(wide, location, metrics, products, day_column="Day"):
+    """Melt a wide editor frame into long rows for ``metrics`` x ``products``.
+
+    Blank cells and columns missing from ``wide`` are NaN values, which
+    :func:`totals` skips. Values are ``float64`` when any of ``metrics`` is
+    a currency metric, else ``float32``.
+    """
+    products = list(products)
+    metrics = list(metrics)
+    columns = [column_name(p, m) for m in metrics for p in products]
+    if set(metrics) & set(CURRENCY_METRICS):
+        dtype = schema.CURRENCY_DTYPE
+    else:
+        dtype = schema.QUANTITY_DTYPE
+    values = schema.matrix(wide, columns, dtype, blank=np.nan)
+    days = schema.days(wide, day_column)
+    n_days, n_columns = values.shape
+
+    return pd.DataFrame(
+        {
+            "location": pd.Categorical.from_codes(
+                np.zeros(n_days * n_columns, dtype=np.int8), [location]
+            ),
+            "product": pd.Categorical.from_codes(
+                np.tile(np.arange(len(products)), n_days * len(metrics)), products
+            ),
+            "day": np.repeat(days, n_columns),
+            "metric": pd.Categorical.from_codes(
+                np.tile(np.repeat(np.arange(len(metrics)), len(products)), n_days),
+                metrics,
+            ),
+            "value": values.ravel(),
+        }
+    )
+
+
+def concat(frames):
+    """Concatenate long frames keeping categorical key columns categorical."""
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return empty()
+    result = {}
+    for column in ["location", "product", "metric"]:
+        result[column] = union_categoricals(
+            [frame[column] for frame in frames], ignore_order=True
+        )
+    value_dtype = np.result_type(*[frame["value"].dtype for frame in frames])
+    for column, dtype in [("day", np.int32), ("value", value_dtype)]:
+        result[column] = np.concatenate(
+            [frame[column].to_numpy(dtype=dtype) for frame in frames]
+        )
+    return pd.DataFrame(result)[KEYS + ["value"]]
+
+
+def empty():
+    return pd.DataFrame(
+        {
+            "location": _categorical([], []),
+            "product": _categorical([], []),
+            "day": np.array([], dtype=np.int32),
+            "metric": _categorical([], []),
+            "value": np.array([], dtype=np.float32),
+        }
+    )
+
+
+def deaccumulate(long, source="COGS(Acc.)", target="COGS(Non-Acc.)"):
+    """Per-period values of an accumulated metric as new ``target`` rows.
+
+    The first day of each location and product keeps its accumulated value,
+    like the page's ``.diff()`` with first-row backfill. Blank (NaN) days
+    stay blank; the day after one is differenced against the last non-blank
+    day.
+    """
+    rows = long[long["metric"] == source].sort_values(
+        ["location", "product", "day"], kind="stable"
+    )
+    observed = rows[rows["value"].notna()]
+    diff = observed.groupby(["location", "product"], observed=True)["value"].diff()
+    first = ~observed.duplicated(["location", "product"])
+    value = diff.mask(first, observed["value"]).reindex(rows.index)
+    result = rows.assign(value=value.astype(rows["value"].dtype))
+    result["metric"] = _categorical([target] * len(result), [target])
+    return result.reset_index(drop=True)
+
+
+def totals(long, metrics=None):
+    """Sum per location and product with one column per metric.
+
+    Sums are accumulated in ``float64`` whatever the value dtype.
+    """
+    if metrics is not None:
+        long = long[long["metric"].isin(metrics)]
+    table = (
+        long["value"]
+        .astype(np.float64)
+        .groupby([long["location"], long["product"], long["metric"]], observed=True)
+        .sum()
+    )
+    table = table.unstack("metric", fill_value=0.0)
+    if metrics is not None:
+        table = table.reindex(columns=list(metrics), fill_value=0.0)
+    return table
+
+
+def compare(long, before="UnitSold-Before", after="UnitSold-After"):
+    """Before/after totals per location and product with change columns.
+
+    Blank (NaN) days are left out; ``Before Days`` and ``After Days`` count
+    the days with a value, so windows of unequal length can be spotted.
+    """
+    table = totals(long, [before, after]).rename(
+        columns={before: "Before", after: "After"}
+    )
+    table.columns = list(table.columns)
+    long = long[long["metric"].isin([before, after])]
+    days = (
+        long.groupby(["location", "product", "metric"], observed=True)["value"]
+        .count()
+        .unstack("metric", fill_value=0)
+        .reindex(index=table.index, columns=[before, after], fill_value=0)
+    )
+    table["Before Days"] = days[before].to_numpy()
+    table["After Days"] = days[after].to_numpy()
+    table["Change"] = table["After"] - table["Before"]
+    table["Change (%)"] = (
+        table["Change"] / table["Before"].where(table["Before"] != 0)
+    ) * 100
+    return table
+
+
+class TimeSeriesStore:
+    """All editor tables of many locations in one long frame."""
+
+    def __init__(self, frame=None):
+        self.frame = empty() if frame is None else frame
+
+    @classmethod
+    def from_locations(cls, store_location, products_of=None):
+        """Collect every stored ``tables`` entry of ``store_location``."""
+        if products_of is None:
+            products_of = product_names
+        frames = []
+        for location, record in store_location.items():
+            for kind, table in record.get("tables", {}).items():
+                frames.append(
+                    to_long(table, location, TABLE_METRICS[kind], products_of(record))
+                )
+        return cls(concat(frames))
@@ -0,0 +1,96 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from retail.optimizer import optimise_restock, restock_bounds
+
+HORIZON = 5
+
+
+def random_case(rng):
+    num_products = rng.integers(1, 5)
+    return {
+        "current_stock": rng.integers(0, 5, num_products),
+        "velocity": rng.uniform(0, 3, num_products),
+        "shelf_life": rng.choice([0, 2, 5], num_products),
+        "dimension": rng.uniform(0, 2, num_products) * (rng.random(num_products) > 0.1),
+        "margin": rng.uniform(-1, 5, num_products),
+        "rental_size": rng.uniform(1, 15),
+    }
+
+
+def brute_force(case):
+    """Best margin over every integer restock within the bounds."""
+    bound = restock_bounds(
+        case["current_stock"], case["velocity"], case["shelf_life"], HORIZON
+    ).astype(int)
+    bound[case["margin"] <= 0] = 0
+    free = max(
+        case["rental_size"] - (case["dimension"] * case["current_stock"]).sum(), 0
+    )
+    best = 0.0
+    for quantities in itertools.product(*[range(b + 1) for b in bound]):
+        quantities = np.array(quantities)
+        if (case["dimension"] * quantities).sum() <= free + 1e-9:
+            best = max(best, (case["margin"] * quantities).sum())
+    return best, bound, free
+
+
+def test_optimise_restock_matches_brute_force():
+    rng = np.random.default_rng(3)
+    exact = 0
+    for _ in range(300):
+        case = random_case(rng)
+        plan = optimise_restock(**case, horizon=HORIZON)
+        best, bound, free = brute_force(case)
+
+        assert (plan.quantities >= 0).all()
+        assert (plan.quantities <= bound).all()
+        assert (case["dimension"] * plan.quantities).sum() <= free + 1e-6
+        assert plan.margin == pytest.approx((case["margin"] * plan.quantities).sum())
+        # Piece volumes are rounded up to grid cells, so a plan may leave a
+        # little margin on the table, never more than a few percent.
+        assert plan.margin >= best * 0.95 - 1e-9
+        exact += plan.margin >= best - 1e-6
+    assert exact >= 297
+
+
+def test_optimise_restock_without_rental_size():
+    plan = optimise_restock([1, 2], [1.0, 1.0], [0, 0], [1.0, 1.0], [2.0, 3.0], 0.0)
+    assert (plan.quantities == 0).all()
+    assert np.isnan(plan.stock_percentage)
+
+
+def test_optimise_restock_many_locations():
+    rng = np.random.default_rng(0)
+    num_locations, num_products = 1000, 100
+    case = {
+        "current_stock": rng.integers(0, 50, (num_locations, num_products)),
+        "velocity": rng.uniform(0, 200, (num_locations, num_products)),
+        "shelf_life": rng.choice([0, 10, 30], num_products),
+        "dimension": rng.uniform(0.001, 0.05, num_products),
+        "margin": rng.uniform(1, 30, num_products),
+        "rental_size": rng.uniform(100, 800, num_locations),
+    }
+    plan = optimise_restock(**case)
+
+    free = np.maximum(
+        case["rental_size"] - (case["dimension"] * case["current_stock"]).sum(axis=1),
+        0,
+    )
+    assert (plan.quantities >= 0).all()
+    assert (plan.quantities <= plan.upper_bound).all()
+    assert (plan.volume <= free + 1e-6).all()
+    # Locations solved together share a coarser grid; each stays within 1%
+    # of its own fine-grid solve.
+    for i in range(0, num_locations, 50):
+        single = optimise_restock(
+            case["current_stock"][i],
+            case["velocity"][i],
+            case["shelf_life"],
+            case["dimension"],
+            case["margin"],
+            case["rental_size"][i],
+        )
+        assert plan.margin[i] >= single.margin * 0.99
@@ -0,0 +1,19 @@
+import numpy as np
+
+from retail import ingest
+from retail.persistence import LocationStore
+
+
+def test_sparse_table_round_trip(tmp_path):
+    store = LocationStore(str(tmp_path / "retail.db"))
+    table = ingest.empty_table("marketing", ["Apple Juice", "Orange Juice"], 5)
+    table.iloc[:3, 1:] = [[100, 120, 50, 55], [102, 118, 52, 56], [98, 121, 49, 54]]
+    table.iloc[3, 1] = 101
+
+    assert store.save_table("Jakarta", "marketing", table)
+    loaded = store.load_table("Jakarta", "marketing")
+
+    assert loaded.equals(table)
+    assert (loaded.dtypes == table.dtypes).all()
+    assert np.isnan(loaded.iloc[4, 1:].to_numpy()).all()
+    assert not store.save_table("Jakarta", "marketing", loaded)